@@ -0,0 +1,140 @@
+from datetime import date, datetime, time
+from typing import Dict, List, Literal, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+from sqlalchemy import and_, case, or_, select
+
+from config import INGEST_MAX_EVENTS
+from models import Attendance, Employee
+from rollups import daily_refresh_statements, monthly_refresh_statements, months_between
+from utils import dialect_insert
+
+
+# =========================
+# SCHEMAS
+# =========================
+class AttendanceEvent(BaseModel):
+    employee_id: str
+    timestamp: datetime  # device local time, like the interactive check-in date
+    direction: Literal["in", "out"]
+
+
+class AttendanceEventBatch(BaseModel):
+    events: List[AttendanceEvent] = Field(..., max_length=INGEST_MAX_EVENTS)
+
+
+# =========================
+# FOLDING
+# =========================
+class DaySpan:
+    __slots__ = ("first_in", "last_out")
+
+    def __init__(self):
+        self.first_in: Optional[time] = None
+        self.last_out: Optional[time] = None
+
+
+def fold_events(events: List[AttendanceEvent]) -> Tuple[Dict[Tuple[str, date], DaySpan], int]:
+    """Collapse swipes to first-in/last-out per (employee, day); returns the spans and the duplicate count"""
+    seen: Set[Tuple[str, datetime, str]] = set()
+    spans: Dict[Tuple[str, date], DaySpan] = {}
+
+    for event in events:
+        key = (event.employee_id, event.timestamp, event.direction)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        moment = event.timestamp.time().replace(tzinfo=None)
+        span = spans.get((event.employee_id, event.timestamp.date()))
+        if span is None:
+            span = spans[(event.employee_id, event.timestamp.date())] = DaySpan()
+
+        if event.direction == "in":
+            if span.first_in is None or moment < span.first_in:
+                span.first_in = moment
+        elif span.last_out is None or moment > span.last_out:
+            span.last_out = moment
+
+    return spans, len(events) - len(seen)
+
+
+def known_employees_statement(employee_ids: List[str]):
+    return select(Employee.employee_id).where(Employee.employee_id.in_(employee_ids))
+
+
+# =========================
+# WRITES
+# =========================
+def attendance_upsert_statement(dialect_name: str):
+    """
+    Executemany upsert merging a day span into any existing row: check_in
+    only moves earlier and check_out only moves later, so replaying a batch
+    or mixing with interactive check-ins is safe.
+    """
+    stmt = dialect_insert(dialect_name)(Attendance)
+    incoming_in = stmt.excluded.check_in
+    incoming_out = stmt.excluded.check_out
+
+    return stmt.on_conflict_do_update(
+        index_elements=[Attendance.employee_id, Attendance.date],
+        set_={
+            "check_in": case(
+                (or_(
+                    Attendance.check_in.is_(None),
+                    and_(incoming_in.isnot(None), incoming_in < Attendance.check_in)
+                ), incoming_in),
+                else_=Attendance.check_in
+            ),
+            "check_out": case(
+                (and_(
+                    incoming_out.isnot(None),
+                    or_(Attendance.check_out.is_(None), incoming_out > Attendance.check_out)
+                ), incoming_out),
+                else_=Attendance.check_out
+            ),
+            "status": "PRESENT"
+        }
+    )
+
+
+def upsert_rows(spans: Dict[Tuple[str, date], DaySpan], known: Set[str]) -> List[dict]:
+    return [
+        {
+            "employee_id": employee_id,
+            "date": day,
+            "check_in": span.first_in,
+            "check_out": span.last_out,
+            "status": "PRESENT"
+        }
+        for (employee_id, day), span in spans.items()
+        if employee_id in known
+    ]
+
+
+def rollup_refresh_statements(rows: List[dict]) -> List:
+    """Recompute the daily and monthly rollups for the days and employees a batch touched"""
+    days = [row["date"] for row in rows]
+    employee_ids = sorted({row["employee_id"] for row in rows})
+
+    statements = daily_refresh_statements(min(days), max(days))
+    for year, month in months_between(min(days), max(days)):
+        statements += monthly_refresh_statements(year, month, employee_ids)
+    return statements
+
+
+def ingested_event(rows: List[dict]) -> dict:
+    """Live-update summary of a batch; dashboards re-fetch the affected days"""
+    return {
+        "days_written": len(rows),
+        "dates": sorted({row["date"] for row in rows})
+    }
+
+
+def ingest_response(received: int, duplicates: int, rows: List[dict], unknown: Set[str]) -> dict:
+    return {
+        "received": received,
+        "duplicates": duplicates,
+        "days_written": len(rows),
+        "unknown_employees": sorted(unknown)
+    }
@@ -0,0 +1,143 @@
+"""
+Benchmark for the /api/dashboard/stats aggregation.
+
+Compares the original multi-scan implementation with stats_engine on
+synthetic legacy JSON data and checks both return the same payload.
+
+    cd backend && python benchmarks/bench_dashboard_stats.py
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stats_engine import compute_dashboard_stats  # noqa: E402
+
+DEPARTMENTS = ["Engineering", "HR", "Sales", "Finance", "Support"]
+
+
+# =========================
+# SYNTHETIC DATA
+# =========================
+def make_data(n_users, days, seed=42):
+    rng = random.Random(seed)
+    today = datetime.now().date()
+
+    users = [
+        {
+            "id": i,
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "role": "admin" if i % 50 == 0 else "employee",
+            "department": DEPARTMENTS[i % len(DEPARTMENTS)]
+        }
+        for i in range(1, n_users + 1)
+    ]
+
+    attendance = []
+    for d in range(days):
+        day = (today - timedelta(days=d)).isoformat()
+        for user in users:
+            if rng.random() < 0.9:
+                attendance.append({
+                    "id": len(attendance) + 1,
+                    "user_id": user["id"],
+                    "date": day,
+                    "check_in": f"{day}T09:00:00",
+                    "check_out": f"{day}T17:00:00" if rng.random() < 0.8 else None
+                })
+
+    statuses = ["pending", "approved", "rejected"]
+    leaves = [
+        {"id": i, "user_id": rng.randint(1, n_users), "status": rng.choice(statuses)}
+        for i in range(1, n_users // 2 + 1)
+    ]
+    return users, attendance, leaves
+
+
+# =========================
+# ORIGINAL IMPLEMENTATION
+# =========================
+def legacy_stats(users, attendance, leaves):
+    today = datetime.now().date()
+    total_employees = len([u for u in users if u.get('role') == 'employee'])
+    today_attendance = [a for a in attendance if datetime.fromisoformat(a.get('date', '')).date() == today]
+    current_month = datetime.now().month
+    current_year = datetime.now().year
+    this_month_attendance = [
+        a for a in attendance
+        if datetime.fromisoformat(a.get('date', '')).month == current_month
+        and datetime.fromisoformat(a.get('date', '')).year == current_year
+    ]
+    departments = {}
+    for user in users:
+        dept = user.get('department', 'Unknown')
+        if dept not in departments:
+            departments[dept] = {'total': 0, 'present': 0}
+        departments[dept]['total'] += 1
+        user_attendance = [a for a in today_attendance if a.get('user_id') == user.get('id')]
+        if user_attendance and user_attendance[0].get('check_in'):
+            departments[dept]['present'] += 1
+    return {
+        "total_users": len(users),
+        "total_employees": total_employees,
+        "total_admins": len([u for u in users if u.get('role') == 'admin']),
+        "today": {
+            "present": len([a for a in today_attendance if a.get('check_in') and a.get('check_out')]),
+            "absent": total_employees - len([a for a in today_attendance if a.get('check_in')]),
+            "total_checked_in": len([a for a in today_attendance if a.get('check_in')])
+        },
+        "leaves": {
+            "pending": len([l for l in leaves if l.get('status') == 'pending']),
+            "approved": len([l for l in leaves if l.get('status') == 'approved']),
+            "rejected": len([l for l in leaves if l.get('status') == 'rejected']),
+            "total": len(leaves)
+        },
+        "this_month": {
+            "total_records": len(this_month_attendance),
+            "unique_employees": len(set(a.get('user_id') for a in this_month_attendance))
+        },
+        "departments": departments
+    }
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="250,500,1000,2000,4000", help="comma-separated user counts")
+    parser.add_argument("--days", type=int, default=30, help="days of attendance per user")
+    parser.add_argument("--skip-legacy-above", type=int, default=2000,
+                        help="skip the quadratic implementation above this many users")
+    args = parser.parse_args()
+
+    print(f"{'users':>8} {'records':>10} {'legacy (s)':>12} {'engine (s)':>12} {'engine us/record':>18}")
+    for n_users in (int(s) for s in args.sizes.split(",")):
+        users, attendance, leaves = make_data(n_users, args.days)
+
+        engine_time, engine_result = timed(compute_dashboard_stats, users, attendance, leaves)
+
+        legacy_cell = "skipped"
+        if n_users <= args.skip_legacy_above:
+            legacy_time, legacy_result = timed(legacy_stats, users, attendance, leaves, repeat=1)
+            assert legacy_result == engine_result, "stats_engine diverged from the original implementation"
+            legacy_cell = f"{legacy_time:.4f}"
+
+        per_record = engine_time / max(len(attendance), 1) * 1e6
+        print(f"{n_users:>8} {len(attendance):>10} {legacy_cell:>12} {engine_time:>12.4f} {per_record:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
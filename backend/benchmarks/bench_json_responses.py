@@ -0,0 +1,114 @@
+"""
+Benchmark for large attendance responses (FAST_JSON).
+
+Times the two halves of a 50k-row list response on an in-memory SQLite
+database: fetching ORM entities vs plain column rows, and FastAPI's default
+jsonable_encoder + JSONResponse vs FastJSONResponse (orjson). Checks both
+serializers produce the same JSON.
+
+    cd backend && python benchmarks/bench_json_responses.py
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import date, time as clock, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from config import Base  # noqa: E402
+from models import Attendance  # noqa: E402
+from fast_json import FastJSONResponse, orjson  # noqa: E402
+from routes.attendance import ATTENDANCE_RECORD_COLUMNS, attendance_record  # noqa: E402
+
+
+# =========================
+# SYNTHETIC DATA
+# =========================
+def make_database(n_rows, employees=500):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Attendance.__table__])
+    today = date.today()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "employee_id": f"EMP{i % employees:05d}",
+            "date": today - timedelta(days=i // employees),
+            "check_in": clock(9, i % 60),
+            "check_out": clock(17, i % 60) if i % 5 else None,
+            "status": "PRESENT" if i % 5 else "CHECKED_IN"
+        }
+        for i in range(n_rows)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Attendance), rows)
+    return engine
+
+
+# =========================
+# FETCH + SERIALIZE
+# =========================
+def fetch_entities(engine):
+    """What get_employee_attendance used to return: Attendance objects for jsonable_encoder"""
+    with Session(engine) as db:
+        return db.execute(select(Attendance).order_by(Attendance.date.desc())).scalars().all()
+
+
+def fetch_rows(engine):
+    with Session(engine) as db:
+        rows = db.execute(select(*ATTENDANCE_RECORD_COLUMNS).order_by(Attendance.date.desc())).all()
+    return [attendance_record(row) for row in rows]
+
+
+def default_render(content):
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_render(content):
+    return FastJSONResponse(content).body
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="5000,20000,50000", help="comma-separated row counts")
+    args = parser.parse_args()
+
+    if orjson is None:
+        sys.exit("orjson is not installed; FastJSONResponse is unavailable")
+
+    print(f"{'rows':>8} {'entities+default (s)':>22} {'rows+default (s)':>18} {'rows+orjson (s)':>17} {'speedup':>9}")
+    for n_rows in (int(s) for s in args.sizes.split(",")):
+        engine = make_database(n_rows)
+
+        entity_fetch, entities = timed(fetch_entities, engine)
+        entity_render, _ = timed(default_render, entities)
+        row_fetch, records = timed(fetch_rows, engine)
+        default_time, default_body = timed(default_render, records)
+        fast_time, fast_body = timed(fast_render, records)
+        assert json.loads(default_body) == json.loads(fast_body), "orjson output diverged from jsonable_encoder"
+
+        before = entity_fetch + entity_render
+        after = row_fetch + fast_time
+        print(f"{n_rows:>8} {before:>22.4f} {row_fetch + default_time:>18.4f} {after:>17.4f} {before / after:>8.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
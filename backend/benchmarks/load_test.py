@@ -0,0 +1,377 @@
+"""
+Load test for the API hot paths, run in-process against main.app.
+
+Boots the app on a throwaway SQLite database (or --database-url, e.g. a
+disposable Postgres) with its own data directory, seeds employees with one
+precomputed password hash, then drives these scenarios through httpx's ASGI
+transport with a fixed number of concurrent clients:
+
+    checkin_storm     every employee checks in, then checks out
+    login_burst       employees log in with their passwords (bcrypt-bound)
+    dashboard_refresh admins load users, attendance, dashboard and bootstrap
+    leave_queue       employees request leave, an admin works the pending queue
+
+Throughput and p50/p95/p99 latency are printed per scenario and endpoint.
+--save writes the results as a JSON baseline; --compare checks a run
+against one and exits 1 when throughput or p95 regress past --tolerance.
+There is no network hop, so numbers show application and database cost
+only; compare runs from the same machine.
+
+    cd backend && python benchmarks/load_test.py --save benchmarks/baselines/sqlite.json
+    cd backend && python benchmarks/load_test.py --compare benchmarks/baselines/sqlite.json
+
+Needs httpx (already required by FastAPI's TestClient).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SCENARIOS = ["checkin_storm", "login_burst", "dashboard_refresh", "leave_queue"]
+DEPARTMENTS = ["Engineering", "HR", "Sales", "Finance", "Support"]
+PASSWORD = "loadtest-password"
+
+# (label, method, url, request kwargs)
+Call = Tuple[str, str, str, dict]
+
+
+# =========================
+# STATISTICS
+# =========================
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "seconds": round(seconds, 4),
+        "throughput_rps": round(len(ordered) / seconds, 2) if seconds else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 50) * 1000, 3),
+            "p95": round(percentile(ordered, 95) * 1000, 3),
+            "p99": round(percentile(ordered, 99) * 1000, 3),
+            "max": round((ordered[-1] if ordered else 0) * 1000, 3)
+        }
+    }
+
+
+class Recorder:
+    """Latencies and failures per endpoint label for one scenario"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.failures: List[str] = []
+        self.seconds = 0.0
+
+    def record(self, label: str, seconds: float, status: int, body: bytes) -> None:
+        self.latencies.setdefault(label, []).append(seconds)
+        if status >= 400:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            if len(self.failures) < 5:
+                self.failures.append(f"{label}: {status} {body[:120]!r}")
+
+    def result(self) -> dict:
+        everything = [s for values in self.latencies.values() for s in values]
+        summary = summarize(everything, sum(self.errors.values()), self.seconds)
+        summary["endpoints"] = {
+            label: summarize(values, self.errors.get(label, 0), self.seconds)
+            for label, values in self.latencies.items()
+        }
+        return summary
+
+
+async def drive(client, calls: List[Call], concurrency: int, recorder: Recorder) -> list:
+    """Run `calls` with `concurrency` clients in flight; responses come back in call order"""
+    responses: list = [None] * len(calls)
+    pending = iter(enumerate(calls))
+
+    async def worker():
+        for index, (label, method, url, kwargs) in pending:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            recorder.record(label, time.perf_counter() - started, response.status_code, response.content)
+            responses[index] = response
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    recorder.seconds += time.perf_counter() - started
+    return responses
+
+
+# =========================
+# ENVIRONMENT
+# =========================
+def configure(args) -> str:
+    """Point config at a scratch database and data directory; must run before the app is imported"""
+    scratch = tempfile.mkdtemp(prefix="attendance-load-")
+    # SQLite serializes writers; give the storm's queued transactions time instead of "database is locked"
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(scratch, 'load.db')}?timeout=30"
+    os.environ["DATA_DIR"] = os.path.join(scratch, "data")
+    os.environ["DASHBOARD_BACKEND"] = args.dashboard_backend
+    if args.bcrypt_rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    return scratch
+
+
+def seed(employees: int, run: str) -> Tuple[List[str], List[str]]:
+    """Bulk-insert employees sharing one password hash, with a week of attendance behind them"""
+    from sqlalchemy import insert
+    from config import SessionLocal
+    from models import User, Employee, Attendance
+    from rollups import rebuild_daily_summary, rebuild_monthly_summary, months_between
+    from utils import pwd_context
+
+    password_hash = pwd_context.hash(PASSWORD)
+    employee_ids = [f"lt{run}-{i}@example.com" for i in range(employees)]
+    admin_ids = [f"lt{run}-admin{i}@example.com" for i in range(max(1, employees // 50))]
+    today = date.today()
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(Employee), [
+            {
+                "id": uuid.uuid4(),
+                "employee_id": eid,
+                "full_name": f"Load Test {i}",
+                "email": eid,
+                "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+                "role": "ADMIN" if eid in admin_ids else "EMPLOYEE"
+            }
+            for i, eid in enumerate(employee_ids + admin_ids)
+        ])
+        db.execute(insert(User), [
+            {"id": uuid.uuid4(), "employee_id": eid, "password_hash": password_hash}
+            for eid in employee_ids + admin_ids
+        ])
+        db.execute(insert(Attendance), [
+            {
+                "id": uuid.uuid4(),
+                "employee_id": eid,
+                "date": today - timedelta(days=d),
+                "check_in": datetime(2000, 1, 1, 9, i % 60).time(),
+                "check_out": datetime(2000, 1, 1, 17, i % 60).time(),
+                "status": "PRESENT"
+            }
+            for d in range(1, 8)
+            for i, eid in enumerate(employee_ids)
+        ])
+        db.commit()
+
+        week_ago = today - timedelta(days=7)
+        rebuild_daily_summary(db, week_ago, today)
+        for year, month in months_between(week_ago, today):
+            rebuild_monthly_summary(db, year, month, today)
+    finally:
+        db.close()
+    return employee_ids, admin_ids
+
+
+def bearer(employee_id: str) -> dict:
+    from utils import create_access_token
+    return {"Authorization": f"Bearer {create_access_token({'sub': employee_id})}"}
+
+
+# =========================
+# SCENARIOS
+# =========================
+async def checkin_storm(client, employees, admins, args, recorder):
+    headers = {eid: bearer(eid) for eid in employees}
+    await drive(client, [
+        ("check-in", "POST", "/api/attendance/check-in", {"headers": headers[eid]}) for eid in employees
+    ], args.concurrency, recorder)
+    await drive(client, [
+        ("check-out", "POST", "/api/attendance/check-out", {"headers": headers[eid]}) for eid in employees
+    ], args.concurrency, recorder)
+
+
+async def login_burst(client, employees, admins, args, recorder):
+    from utils import password_pool
+
+    # Beyond max_pending the pool sheds logins with 503; stay within it to measure capacity
+    sample = [employees[i % len(employees)] for i in range(args.logins)]
+    await drive(client, [
+        ("login", "POST", "/api/auth/login", {"json": {"email": eid, "password": PASSWORD}}) for eid in sample
+    ], min(args.concurrency, password_pool.max_pending), recorder)
+
+
+async def dashboard_refresh(client, employees, admins, args, recorder):
+    calls: List[Call] = []
+    for i in range(args.refreshes):
+        headers = bearer(admins[i % len(admins)])
+        token = {"token": headers["Authorization"].split(" ", 1)[1]}
+        calls += [
+            ("users", "GET", "/api/users", {"headers": headers}),
+            ("attendance/all", "GET", "/api/attendance/all", {"headers": headers}),
+            ("dashboard/stats", "GET", "/api/dashboard/stats", {"params": token}),
+            ("dashboard/attendance-chart", "GET", "/api/dashboard/attendance-chart", {"params": token}),
+            ("dashboard/monthly-report", "GET", "/api/dashboard/monthly-report", {"params": token}),
+            ("admin/bootstrap", "GET", "/api/admin/bootstrap", {"headers": headers}),
+        ]
+    await drive(client, calls, args.concurrency, recorder)
+
+
+async def leave_queue(client, employees, admins, args, recorder):
+    start = (date.today() + timedelta(days=30)).isoformat()
+    await drive(client, [
+        ("leaves/request", "POST", "/api/leaves/request", {
+            "headers": bearer(eid),
+            "json": {"user_id": i + 1, "start_date": start, "end_date": start, "reason": "load test"}
+        })
+        for i, eid in enumerate(employees[:args.leaves])
+    ], args.concurrency, recorder)
+
+    # The admin refreshes the queue and decides everything on it, until it is empty
+    headers = bearer(admins[0])
+    while True:
+        (pending,) = await drive(client, [("leaves/pending", "GET", "/api/leaves/pending", {"headers": headers})], 1, recorder)
+        leaves = pending.json() if pending.status_code == 200 else []
+        if not leaves:
+            break
+        await drive(client, [
+            (f"leaves/{action}", "POST", f"/api/leaves/{action}/{leave['id']}", {"headers": headers})
+            for leave, action in zip(leaves[:args.concurrency * 4], ["approve", "reject"] * len(leaves))
+        ], args.concurrency, recorder)
+
+
+# =========================
+# BASELINES
+# =========================
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print the change against `baseline`; True if any scenario regressed past `tolerance`"""
+    regressed = False
+    print(f"\nvs baseline {baseline['meta'].get('revision', '?')} ({baseline['meta'].get('created_at', '?')})")
+    print(f"{'scenario':<20} {'rps':>10} {'base rps':>10} {'p95 ms':>10} {'base p95':>10}  verdict")
+    for name, current in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<20} {'(not in baseline)':>42}")
+            continue
+        slower = current["latency_ms"]["p95"] > before["latency_ms"]["p95"] * (1 + tolerance)
+        fewer = current["throughput_rps"] < before["throughput_rps"] * (1 - tolerance)
+        verdict = "REGRESSED" if slower or fewer else "ok"
+        regressed |= slower or fewer
+        print(
+            f"{name:<20} {current['throughput_rps']:>10.1f} {before['throughput_rps']:>10.1f} "
+            f"{current['latency_ms']['p95']:>10.2f} {before['latency_ms']['p95']:>10.2f}  {verdict}"
+        )
+    return regressed
+
+
+def report(name: str, result: dict) -> None:
+    rows = [(name, result)] + [(f"  {label}", stats) for label, stats in result["endpoints"].items()]
+    for label, stats in rows:
+        latency = stats["latency_ms"]
+        print(
+            f"{label:<30} {stats['requests']:>8} {stats['errors']:>7} {stats['throughput_rps']:>10.1f} "
+            f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+        )
+
+
+async def run(args) -> dict:
+    import httpx
+    import main
+    from init_data import ensure_initialized
+
+    # ASGITransport sends no lifespan events: set the database up as a starting worker would
+    ensure_initialized()
+    run_tag = uuid.uuid4().hex[:8]
+    employees, admins = seed(args.employees, run_tag)
+
+    results = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "async_db": main.ASYNC_DB,
+            "options": {
+                "employees": args.employees, "concurrency": args.concurrency, "logins": args.logins,
+                "refreshes": args.refreshes, "leaves": args.leaves,
+                "dashboard_backend": args.dashboard_backend, "bcrypt_rounds": os.environ.get("BCRYPT_ROUNDS")
+            }
+        },
+        "scenarios": {}
+    }
+
+    print(f"{'scenario / endpoint':<30} {'requests':>8} {'errors':>7} {'rps':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    # Unhandled app errors count as 500s instead of aborting the run
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        for name in args.scenarios:
+            recorder = Recorder()
+            await globals()[name](client, employees, admins, args, recorder)
+            results["scenarios"][name] = recorder.result()
+            report(name, results["scenarios"][name])
+            for failure in recorder.failures:
+                print(f"    ! {failure}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenarios to run")
+    parser.add_argument("--employees", type=int, default=500, help="seeded employees (check-in storm size)")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--logins", type=int, default=100, help="logins in the login burst")
+    parser.add_argument("--refreshes", type=int, default=50, help="admin dashboard refreshes")
+    parser.add_argument("--leaves", type=int, default=200, help="leave requests queued for approval")
+    parser.add_argument("--database-url", help="disposable database to run against (default: scratch SQLite)")
+    parser.add_argument("--dashboard-backend", default="sql", choices=["sql", "json"])
+    parser.add_argument("--bcrypt-rounds", type=int, help="override BCRYPT_ROUNDS for the run")
+    parser.add_argument("--save", help="write results to this JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95/throughput change before failing")
+    args = parser.parse_args()
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    configure(args)
+    results = asyncio.run(run(args))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nsaved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # optional: gzip only
+    BrotliMiddleware = None
+
+
+class CompressionMiddleware:
+    """
+    Brotli when brotli-asgi is installed (falling back to gzip for clients
+    without br support), plain gzip otherwise. Event streams are passed
+    through untouched: a compressor would hold SSE messages in its buffer.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000):
+        self.app = app
+        if BrotliMiddleware is not None:
+            self.compressed = BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=True)
+        else:
+            self.compressed = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=6)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "text/event-stream" not in Headers(scope=scope).get("accept", ""):
+            await self.compressed(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -1,6 +1,7 @@
 import os
 from datetime import timedelta
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # =========================
@@ -8,13 +9,23 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 # =========================
 BASE_DIR = os.path.dirname(__file__)
 
-DATA_DIR = os.path.join(BASE_DIR, 'data')
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(BASE_DIR, 'data'))
 USERS_FILE = os.path.join(DATA_DIR, 'users.json')
 ATTENDANCE_FILE = os.path.join(DATA_DIR, 'attendance.json')
 LEAVES_FILE = os.path.join(DATA_DIR, 'leaves.json')
+LEAVES_LOG_FILE = os.path.join(DATA_DIR, 'leaves.log')
+
+# Leave changes are appended to LEAVES_LOG_FILE and folded into LEAVES_FILE this often
+LEAVES_COMPACT_EVERY = int(os.getenv("LEAVES_COMPACT_EVERY", "1000"))
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# How long the first writer waits for others to join its write (0 = only merge overlapping writes)
+JSON_WRITE_COALESCE_MS = float(os.getenv("JSON_WRITE_COALESCE_MS", "2"))
+
+# Parsed JSON documents are cached per process up to this much on-disk size
+JSON_CACHE_MAX_MB = int(os.getenv("JSON_CACHE_MAX_MB", "256"))
+
 # =========================
 # Security / JWT Settings
 # =========================
@@ -30,6 +41,40 @@ ACCESS_TOKEN_EXPIRE_DELTA = timedelta(
     minutes=ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
+# bcrypt cost factor (2^rounds iterations); existing hashes keep verifying at their own cost
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Hashing runs on a dedicated pool; requests beyond MAX_PENDING get a 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8)))
+
+# Resolved principals are cached per process; a TTL of 0 disables the cache
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+# Badge readers/kiosks authenticate event uploads with one of these keys (comma-separated)
+DEVICE_API_KEYS = [k.strip() for k in os.getenv("DEVICE_API_KEYS", "").split(",") if k.strip()]
+INGEST_MAX_EVENTS = int(os.getenv("INGEST_MAX_EVENTS", "50000"))
+
+# Live dashboard stream: events buffered per client before it is told to resync
+LIVE_UPDATES_MAX_QUEUED = int(os.getenv("LIVE_UPDATES_MAX_QUEUED", "100"))
+LIVE_UPDATES_HEARTBEAT_SECONDS = float(os.getenv("LIVE_UPDATES_HEARTBEAT_SECONDS", "15"))
+
+# Opt-in orjson serialization for large list/dashboard responses (falls back if orjson is missing)
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+# Opt-in per-request SQL accounting: X-DB-* response headers, warnings for N+1 patterns
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "false").lower() in ("1", "true", "yes")
+SQL_QUERY_BUDGET = int(os.getenv("SQL_QUERY_BUDGET", "10"))
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "3"))
+
+# Create the schema and demo accounts when a worker starts, unless the database is marked as set up.
+# Turn off where `python init_data.py` runs as a deploy step before the workers start
+INIT_DATA_ON_STARTUP = os.getenv("INIT_DATA_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1000"))
+
 # =========================
 # Database Configuration (NEW)
 # =========================
@@ -38,10 +83,25 @@ DATABASE_URL = os.getenv(
     "postgresql://attendance_user:strongpassword@db:5432/attendance"
 )
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True
-)
+# Per engine, so a worker holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections to each database
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Seconds before a pooled connection is replaced (-1 = never); keep it under the server/proxy idle timeout
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+# Test each connection with a round trip on checkout; with DB_POOL_RECYCLE set this is usually unnecessary
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+
+def pool_options(url: str) -> dict:
+    """create_engine() pool settings; SQLite keeps the driver's own pool (NullPool/SingletonThreadPool), which takes no sizes"""
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL))
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -49,4 +109,82 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Optional replica for read-only routes (lists, exports, reports); unset means they use the primary
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+read_engine = create_engine(DATABASE_READ_URL, **pool_options(DATABASE_READ_URL)) if DATABASE_READ_URL else engine
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine
+) if DATABASE_READ_URL else SessionLocal
+
 Base = declarative_base()
+
+# =========================
+# Async Database (opt-in)
+# =========================
+ASYNC_DB = os.getenv("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart"""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme.split("+")[0], scheme) + sep + rest
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+ASYNC_DATABASE_READ_URL = os.getenv(
+    "ASYNC_DATABASE_READ_URL",
+    to_async_url(DATABASE_READ_URL) if DATABASE_READ_URL else None
+)
+
+async_engine = None
+AsyncSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL))
+
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+    async_read_engine = async_engine
+    AsyncReadSessionLocal = AsyncSessionLocal
+    if ASYNC_DATABASE_READ_URL:
+        async_read_engine = create_async_engine(ASYNC_DATABASE_READ_URL, **pool_options(ASYNC_DATABASE_READ_URL))
+        AsyncReadSessionLocal = async_sessionmaker(
+            async_read_engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+
+
+def database_engines() -> dict:
+    """Every engine this process opens, by role, as sync Engines (async ones via .sync_engine)"""
+    engines = {"sync": engine}
+    if read_engine is not engine:
+        engines["read"] = read_engine
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    if async_read_engine is not async_engine:
+        engines["async_read"] = async_read_engine.sync_engine
+    return engines
+
+# =========================
+# Dashboard Backend
+# =========================
+# "json" reads the legacy data files, "sql" aggregates the database tables
+DASHBOARD_BACKEND = os.getenv("DASHBOARD_BACKEND", "json").lower()
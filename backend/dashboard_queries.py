@@ -0,0 +1,249 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from models import Attendance, Employee, Leave, DailyAttendanceSummary, MonthlyAttendanceSummary
+
+# Working days assumed per month by the monthly report
+WORKING_DAYS_PER_MONTH = 20
+
+
+# =========================
+# HELPERS
+# =========================
+def count_if(condition):
+    """COUNT(*) FILTER (WHERE condition)"""
+    return func.count().filter(condition)
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """Return the first day of the month and the first day of the next one"""
+    start = date(year, month, 1)
+    if month == 12:
+        return start, date(year + 1, 1, 1)
+    return start, date(year, month + 1, 1)
+
+
+CHECKED_IN = Attendance.check_in.isnot(None)
+PRESENT = and_(Attendance.check_in.isnot(None), Attendance.check_out.isnot(None))
+
+
+# =========================
+# STATS
+# =========================
+def get_stats(db: Session, today: Optional[date] = None) -> Dict[str, Any]:
+    today = today or datetime.now().date()
+    month_start, month_end = month_bounds(today.year, today.month)
+
+    # Round trip 1: headcount and today's check-ins per department
+    department_rows = (
+        db.query(
+            Employee.department,
+            func.count(func.distinct(Employee.employee_id)),
+            func.count(func.distinct(Employee.employee_id)).filter(Employee.role == "EMPLOYEE"),
+            func.count(func.distinct(Employee.employee_id)).filter(Employee.role == "ADMIN"),
+            func.count(func.distinct(Employee.employee_id)).filter(CHECKED_IN),
+        )
+        .outerjoin(
+            Attendance,
+            and_(
+                Attendance.employee_id == Employee.employee_id,
+                Attendance.date == today
+            )
+        )
+        .group_by(Employee.department)
+        .all()
+    )
+
+    # Round trip 2: attendance counters, with leave counters as scalar subqueries
+    counters = (
+        db.query(
+            count_if(and_(Attendance.date == today, CHECKED_IN)).label("checked_in"),
+            count_if(and_(Attendance.date == today, PRESENT)).label("present"),
+            func.count().label("month_records"),
+            func.count(func.distinct(Attendance.employee_id)).label("month_employees"),
+            db.query(count_if(Leave.status == "PENDING")).scalar_subquery().label("pending"),
+            db.query(count_if(Leave.status == "APPROVED")).scalar_subquery().label("approved"),
+            db.query(count_if(Leave.status == "REJECTED")).scalar_subquery().label("rejected"),
+            db.query(func.count(Leave.id)).scalar_subquery().label("total"),
+        )
+        .filter(Attendance.date >= month_start, Attendance.date < month_end)
+        .one()
+    )
+
+    departments = {}
+    total_users = total_employees = total_admins = 0
+    for department, total, employees, admins, present in department_rows:
+        departments[department or "Unknown"] = {"total": total, "present": present}
+        total_users += total
+        total_employees += employees
+        total_admins += admins
+
+    return {
+        "total_users": total_users,
+        "total_employees": total_employees,
+        "total_admins": total_admins,
+        "today": {
+            "present": counters.present,
+            "absent": total_employees - counters.checked_in,
+            "total_checked_in": counters.checked_in
+        },
+        "leaves": {
+            "pending": counters.pending,
+            "approved": counters.approved,
+            "rejected": counters.rejected,
+            "total": counters.total
+        },
+        "this_month": {
+            "total_records": counters.month_records,
+            "unique_employees": counters.month_employees
+        },
+        "departments": departments
+    }
+
+
+# =========================
+# ATTENDANCE CHART
+# =========================
+def get_attendance_chart(db: Session, days: int = 7, today: Optional[date] = None) -> List[Dict[str, Any]]:
+    today = today or datetime.now().date()
+    start = today - timedelta(days=days - 1)
+
+    # One rollup row per day and department, kept current by check-in/check-out
+    headcount = db.query(func.count(Employee.id)).scalar()
+    rows = (
+        db.query(
+            DailyAttendanceSummary.date,
+            func.sum(DailyAttendanceSummary.present),
+            func.sum(DailyAttendanceSummary.checked_in),
+        )
+        .filter(DailyAttendanceSummary.date >= start, DailyAttendanceSummary.date <= today)
+        .group_by(DailyAttendanceSummary.date)
+        .all()
+    )
+    by_date = {row[0]: (row[1], row[2]) for row in rows}
+
+    chart_data = []
+    for i in range(days - 1, -1, -1):
+        day = today - timedelta(days=i)
+        present, checked_in = by_date.get(day, (0, 0))
+        chart_data.append({
+            "date": str(day),
+            "present": present,
+            "absent": headcount - checked_in,
+            "checked_in": checked_in
+        })
+    return chart_data
+
+
+# =========================
+# EMPLOYEE PERFORMANCE
+# =========================
+def get_employee_performance(db: Session) -> List[Dict[str, Any]]:
+    attendance_summary = (
+        db.query(
+            Attendance.employee_id.label("employee_id"),
+            func.count().label("records"),
+            func.count(func.distinct(Attendance.date)).label("days"),
+            count_if(PRESENT).label("present"),
+        )
+        .group_by(Attendance.employee_id)
+        .subquery()
+    )
+    leave_summary = (
+        db.query(
+            Leave.employee_id.label("employee_id"),
+            count_if(Leave.status == "APPROVED").label("approved"),
+            count_if(Leave.status == "PENDING").label("pending"),
+        )
+        .group_by(Leave.employee_id)
+        .subquery()
+    )
+
+    rows = (
+        db.query(
+            Employee,
+            func.coalesce(attendance_summary.c.records, 0),
+            func.coalesce(attendance_summary.c.days, 0),
+            func.coalesce(attendance_summary.c.present, 0),
+            func.coalesce(leave_summary.c.approved, 0),
+            func.coalesce(leave_summary.c.pending, 0),
+        )
+        .outerjoin(attendance_summary, attendance_summary.c.employee_id == Employee.employee_id)
+        .outerjoin(leave_summary, leave_summary.c.employee_id == Employee.employee_id)
+        .filter(Employee.role == "EMPLOYEE")
+        .all()
+    )
+
+    performance_data = []
+    for emp, records, days, present, approved, pending in rows:
+        attendance_rate = (present / days * 100) if days > 0 else 0
+        performance_data.append({
+            "user_id": emp.employee_id,
+            "name": emp.full_name,
+            "email": emp.email,
+            "department": emp.department,
+            "total_attendance_records": records,
+            "present_days": present,
+            "attendance_rate": round(attendance_rate, 2),
+            "approved_leaves": approved,
+            "pending_leaves": pending
+        })
+
+    return sorted(performance_data, key=lambda x: x['attendance_rate'], reverse=True)
+
+
+# =========================
+# MONTHLY REPORT
+# =========================
+def get_monthly_report(db: Session, month: int, year: int) -> Dict[str, Any]:
+    # Served from monthly_attendance_summary; callers run rollups.ensure_monthly_summary first
+    in_month = and_(MonthlyAttendanceSummary.year == year, MonthlyAttendanceSummary.month == month)
+
+    totals = (
+        db.query(
+            func.coalesce(func.sum(MonthlyAttendanceSummary.records), 0).label("records"),
+            count_if(MonthlyAttendanceSummary.records > 0).label("employees"),
+            func.coalesce(func.sum(MonthlyAttendanceSummary.present), 0).label("present"),
+            func.coalesce(func.sum(MonthlyAttendanceSummary.checked_in), 0).label("checked_in"),
+            db.query(func.count(Employee.id)).scalar_subquery().label("headcount"),
+        )
+        .filter(in_month)
+        .one()
+    )
+
+    rows = (
+        db.query(
+            Employee.full_name,
+            Employee.email,
+            func.coalesce(MonthlyAttendanceSummary.present, 0),
+            func.coalesce(MonthlyAttendanceSummary.checked_in, 0),
+        )
+        .outerjoin(
+            MonthlyAttendanceSummary,
+            and_(MonthlyAttendanceSummary.employee_id == Employee.employee_id, in_month)
+        )
+        .filter(Employee.role == "EMPLOYEE")
+        .order_by(Employee.full_name)
+        .all()
+    )
+
+    return {
+        "month": month,
+        "year": year,
+        "total_records": totals.records,
+        "unique_employees": totals.employees,
+        "total_present": totals.present,
+        "total_absent": totals.headcount * WORKING_DAYS_PER_MONTH - totals.checked_in,
+        "employee_summary": [
+            {
+                "name": name,
+                "email": email,
+                "present": present,
+                "absent": WORKING_DAYS_PER_MONTH - checked_in
+            }
+            for name, email, present, checked_in in rows
+        ]
+    }
@@ -0,0 +1,96 @@
+import logging
+import zlib
+from typing import Callable
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import CollectionVersion
+from utils import get_read_db, get_async_read_db, dialect_insert
+
+logger = logging.getLogger(__name__)
+
+
+class NotModified(Exception):
+    """Raised by an ETag dependency when the client's copy is current; main turns it into a 304"""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+# =========================
+# VERSIONS
+# =========================
+def bump_version_statement(dialect_name: str, name: str):
+    """Run before the commit of any write to `name` so cached copies of its lists go stale"""
+    stmt = dialect_insert(dialect_name)(CollectionVersion).values(name=name, version=1)
+    return stmt.on_conflict_do_update(
+        index_elements=[CollectionVersion.name],
+        set_={"version": CollectionVersion.version + 1}
+    )
+
+
+def bump_version(db: Session, name: str) -> None:
+    """
+    Bump in a short transaction of its own, after the write has committed.
+    For hot writers (check-in/check-out): bumping inside their transaction
+    holds the collection_versions row lock until commit, so concurrent
+    writers queue on it. Bumping afterwards can briefly hand out the old tag
+    with the new data, but that tag stops matching once the bump lands.
+    """
+    try:
+        db.execute(bump_version_statement(db.get_bind().dialect.name, name))
+        db.commit()
+    except SQLAlchemyError:
+        # The write itself committed; a missed bump only delays the next 200
+        db.rollback()
+        logger.exception("Could not bump the %s version", name)
+
+
+async def bump_version_async(db: AsyncSession, name: str) -> None:
+    try:
+        await db.execute(bump_version_statement(db.get_bind().dialect.name, name))
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        logger.exception("Could not bump the %s version", name)
+
+
+def version_statement(name: str):
+    return select(CollectionVersion.version).where(CollectionVersion.name == name)
+
+
+# =========================
+# CONDITIONAL GET
+# =========================
+def etag_value(name: str, version: str, request: Request) -> str:
+    """Weak ETag: the collection version plus the query string (filters, cursor, limit)"""
+    query = zlib.crc32(str(request.url.query).encode())
+    return f'W/"{name}.{version}.{query:08x}"'
+
+
+def check_etag(request: Request, response: Response, etag: str) -> None:
+    """Short-circuit with 304 if If-None-Match already has this ETag, else advertise it"""
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        raise NotModified(etag)
+    response.headers["ETag"] = etag
+
+
+def collection_etag(name: str) -> Callable:
+    """Dependency answering If-None-Match from collection_versions, before the list query runs"""
+    def dependency(request: Request, response: Response, db: Session = Depends(get_read_db)) -> None:
+        version = db.execute(version_statement(name)).scalar() or 0
+        check_etag(request, response, etag_value(name, str(version), request))
+    return dependency
+
+
+def collection_etag_async(name: str) -> Callable:
+    async def dependency(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)) -> None:
+        version = (await db.execute(version_statement(name))).scalar() or 0
+        check_etag(request, response, etag_value(name, str(version), request))
+    return dependency
@@ -0,0 +1,55 @@
+from decimal import Decimal
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from config import FAST_JSON
+
+try:
+    import orjson
+except ImportError:  # optional: stay on FastAPI's default encoder
+    orjson = None
+
+
+def encode_fallback(value: Any) -> Any:
+    """Types orjson leaves to the caller: Decimal comes back from Postgres AVG/ROUND"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Serialize with orjson, which encodes date, time, datetime and UUID
+    natively. Handlers return it directly so FastAPI skips jsonable_encoder,
+    which otherwise walks and copies every nested value first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=encode_fallback,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+FAST_JSON_ENABLED = FAST_JSON and orjson is not None
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> Any:
+    """
+    `content` as a FastJSONResponse when FAST_JSON is on, else unchanged for the
+    default path. Headers already set on the injected `response` (ETag,
+    X-Next-Cursor) are carried over, since FastAPI only merges them into
+    responses it builds itself.
+    """
+    if not FAST_JSON_ENABLED:
+        return content
+
+    fast = FastJSONResponse(content)
+    if response is not None:
+        for name, value in response.headers.items():
+            if name != "content-length":
+                fast.headers[name] = value
+    return fast
@@ -1,9 +1,85 @@
-from datetime import datetime, timedelta
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from contextlib import ExitStack
+from typing import Any, Dict, Iterator, List, Set
+
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
 from sqlalchemy.orm import Session
 
-from config import Base, engine, SessionLocal
+from config import Base, engine, SessionLocal, USERS_FILE, ATTENDANCE_FILE, LEAVES_FILE, LEAVES_LOG_FILE
 from utils import hash_password
-from models import User, Employee, Attendance, Leave  # adjust if Leave model name differs
+from models import User, Employee, Attendance, Leave, CollectionVersion  # adjust if Leave model name differs
+from rollups import rebuild_daily_summary, rebuild_monthly_summary, months_between
+
+# Bump when models gain tables/indexes or the seed changes, so the next boot runs setup again
+SCHEMA_VERSION = 1
+# Row in collection_versions recording the SCHEMA_VERSION initialize_data() last completed
+SCHEMA_MARKER = "schema"
+
+
+def is_initialized() -> bool:
+    """One primary-key lookup: True once initialize_data() has completed for SCHEMA_VERSION"""
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(
+                select(CollectionVersion.version).where(CollectionVersion.name == SCHEMA_MARKER)
+            ).scalar()
+    except (OperationalError, ProgrammingError):
+        # Fresh database: collection_versions does not exist yet
+        return False
+    return version == SCHEMA_VERSION
+
+
+def ensure_initialized() -> bool:
+    """Run initialize_data() unless this schema version is already set up; True if it ran"""
+    if is_initialized():
+        return False
+    try:
+        initialize_data()
+    except IntegrityError:
+        # Another worker booting against the same fresh database got there first
+        print("⚠️ Database is being initialized by another process")
+    return True
+
+
+def merge_duplicate_attendance() -> int:
+    """Fold rows sharing (employee_id, date) into one: earliest check-in, latest check-out"""
+    db: Session = SessionLocal()
+    try:
+        duplicates = db.execute(
+            select(Attendance.employee_id, Attendance.date)
+            .group_by(Attendance.employee_id, Attendance.date)
+            .having(func.count() > 1)
+        ).all()
+
+        for employee_id, day in duplicates:
+            rows = (
+                db.query(Attendance)
+                .filter(Attendance.employee_id == employee_id, Attendance.date == day)
+                .all()
+            )
+            # Keep the row with the earliest check-in (rows without one last)
+            rows.sort(key=lambda r: (r.check_in is None, r.check_in or time.min))
+            kept = rows[0]
+            check_outs = [r.check_out for r in rows if r.check_out is not None]
+            kept.check_out = max(check_outs) if check_outs else None
+            for row in rows[1:]:
+                db.delete(row)
+
+        db.commit()
+        if duplicates:
+            earliest = min(day for _, day in duplicates)
+            print(f"⚠️ Rollups counted the duplicates: run python rollups.py --start-date {earliest.isoformat()}")
+        return len(duplicates)
+    finally:
+        db.close()
 
 
 def initialize_data():
@@ -13,6 +89,20 @@ def initialize_data():
     Base.metadata.create_all(bind=engine)
     print("✅ Database tables created")
 
+    # create_all skips tables that already exist, so add indexes introduced later.
+    # A failure propagates: the schema marker is only written once every index exists
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except IntegrityError:
+                if index.name != "uq_attendance_employee_date":
+                    raise
+                # Check-in/check-out upserts conflict on this index; it cannot be skipped
+                merged = merge_duplicate_attendance()
+                print(f"✅ Merged {merged} duplicate attendance days")
+                index.create(bind=engine, checkfirst=True)
+
     db: Session = SessionLocal()
 
     try:
@@ -73,11 +163,13 @@ def initialize_data():
         # =========================
         today = datetime.utcnow().date()
 
+        sample_attendance_created = False
         if not db.query(Attendance).first():
+            sample_attendance_created = True
             sample_attendance = Attendance(
                 employee_id="emp@example.com",
                 date=today,
-                check_in=datetime.utcnow(),
+                check_in=datetime.utcnow().time(),
                 check_out=None,
                 status="PRESENT"
             )
@@ -111,11 +203,290 @@ def initialize_data():
             print("✅ Sample leave requests created")
 
         db.commit()
+
+        if sample_attendance_created:
+            rebuild_daily_summary(db, today, today)
+            rebuild_monthly_summary(db, today.year, today.month, today)
+
+        # Last, so an interrupted setup is retried on the next start
+        db.merge(CollectionVersion(name=SCHEMA_MARKER, version=SCHEMA_VERSION))
+        db.commit()
+
         print("🎉 Initial data setup completed successfully")
 
     finally:
         db.close()
 
 
+# =========================
+# SCALE DATA (PERFORMANCE TESTING)
+# =========================
+SCALE_DEPARTMENTS = [
+    "Engineering", "Sales", "Support", "Operations", "Finance", "Marketing",
+    "HR", "Product", "Research", "Legal", "Design", "Security"
+]
+LEAVE_REASONS = ["Annual vacation", "Sick leave", "Medical appointment", "Family event", "Personal"]
+
+
+def scale_departments(count: int) -> List[str]:
+    return [
+        SCALE_DEPARTMENTS[i] if i < len(SCALE_DEPARTMENTS) else f"Department {i + 1}"
+        for i in range(count)
+    ]
+
+
+def scale_employees(rng: random.Random, count: int, departments: List[str], start: date, today: date) -> List[Dict[str, Any]]:
+    """
+    Departments sized roughly 1/k, like most org charts; one admin per 50
+    people; a tenth of the staff hired partway through the period.
+    """
+    weights = [1 / (k + 1) for k in range(len(departments))]
+    span = (today - start).days
+    employees = []
+    for i in range(count):
+        email = f"employee{i + 1:07d}@example.com"
+        employees.append({
+            "legacy_id": i + 1,
+            "employee_id": email,
+            "full_name": f"Employee {i + 1}",
+            "email": email,
+            "department": rng.choices(departments, weights)[0],
+            "role": "ADMIN" if i % 50 == 0 else "EMPLOYEE",
+            "hired": start + timedelta(days=rng.randrange(span)) if rng.random() < 0.1 else start,
+            # How reliably this person shows up and checks out
+            "presence": rng.uniform(0.85, 0.98),
+            "arrival": rng.gauss(9 * 60, 20)
+        })
+    return employees
+
+
+def scale_leaves(rng: random.Random, employee: Dict[str, Any], start: date, end: date, today: date) -> List[Dict[str, Any]]:
+    """About four requests per employee-year, 1-5 days each; past ones mostly decided, future ones mostly pending"""
+    leaves = []
+    days = (end - employee["hired"]).days
+    for _ in range(max(0, round(rng.gauss(4 * days / 365, 1)))):
+        first = employee["hired"] + timedelta(days=rng.randrange(max(days, 1)))
+        last = first + timedelta(days=rng.choice([0, 0, 1, 2, 4]))
+        if first <= today:
+            status = rng.choices(["approved", "rejected", "pending"], [85, 10, 5])[0]
+        else:
+            status = rng.choices(["pending", "approved", "rejected"], [60, 35, 5])[0]
+        leaves.append({
+            "start_date": first,
+            "end_date": last,
+            "reason": rng.choice(LEAVE_REASONS),
+            "status": status,
+            "created_at": min(first, today) - timedelta(days=rng.randrange(1, 30))
+        })
+    return leaves
+
+
+def scale_attendance(rng: random.Random, employee: Dict[str, Any], today: date, leave_days: Set[date]) -> Iterator[tuple]:
+    """(date, check_in, check_out) for each working day attended; people still at work today have no check-out"""
+    day = employee["hired"]
+    while day <= today:
+        if day.weekday() < 5 and day not in leave_days and rng.random() < employee["presence"]:
+            arrival = min(max(rng.gauss(employee["arrival"], 15), 7 * 60), 11 * 60)
+            departure = arrival + rng.gauss(8.5 * 60, 40)
+            check_out = None
+            if day < today and rng.random() < 0.97:
+                check_out = clock(min(departure, 23 * 60 + 59))
+            yield day, clock(arrival), check_out
+        day += timedelta(days=1)
+
+
+def clock(minutes: float) -> time:
+    seconds = int(minutes * 60)
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def bulk_write(db: Session, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """COPY on Postgres, executemany INSERT elsewhere"""
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if row[c] is None else row[c] for c in columns])
+        buffer.seek(0)
+        cursor = db.connection().connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    else:
+        db.execute(insert(table), rows)
+
+
+class JSONArrayFile:
+    """Stream a JSON list to disk item by item, then move it into place"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + ".generating"
+        self.first = True
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.tmp_path, "w")
+        self.file.write("[")
+        return self
+
+    def write(self, item: Dict[str, Any]) -> None:
+        self.file.write(("\n" if self.first else ",\n") + json.dumps(item, default=str))
+        self.first = False
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.write("\n]\n")
+        self.file.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.unlink(self.tmp_path)
+
+
+def generate_scale_data(
+    employees: int,
+    departments: int,
+    years: float,
+    seed: int = 42,
+    emit_json: bool = False,
+    batch_size: int = 20000
+) -> None:
+    """
+    Seed `employees` people across `departments` with `years` of weekday
+    attendance and leave history, for performance work. Every account
+    shares one password hash ("password"), so this costs a single bcrypt
+    call, and rows go in through bulk_write in batches of `batch_size`.
+    With `emit_json`, the legacy users/attendance/leaves files are
+    rewritten with the same people and history.
+    """
+    rng = random.Random(seed)
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=int(years * 365))
+    people = scale_employees(rng, employees, scale_departments(departments), start, today)
+
+    Base.metadata.create_all(bind=engine)
+    db: Session = SessionLocal()
+
+    try:
+        if db.execute(select(Employee.id).where(Employee.employee_id == people[0]["employee_id"])).first():
+            print("⚠️ Scale data already present; use a fresh database")
+            return
+
+        password_hash = hash_password("password")
+        profile = ["employee_id", "full_name", "email", "department", "role"]
+        for offset in range(0, len(people), batch_size):
+            batch = people[offset:offset + batch_size]
+            bulk_write(db, Employee.__table__, [{"id": uuid.uuid4(), **{k: p[k] for k in profile}} for p in batch])
+            bulk_write(db, User.__table__, [
+                {"id": uuid.uuid4(), "employee_id": p["employee_id"], "password_hash": password_hash}
+                for p in batch
+            ])
+        db.commit()
+        print(f"✅ {len(people)} employees created")
+
+        json_files = ExitStack()
+        if emit_json:
+            users_json, attendance_json, leaves_json = (
+                json_files.enter_context(JSONArrayFile(path))
+                for path in (USERS_FILE, ATTENDANCE_FILE, LEAVES_FILE)
+            )
+            for p in people:
+                users_json.write({
+                    "id": p["legacy_id"],
+                    "name": p["full_name"],
+                    "email": p["email"],
+                    "role": p["role"].lower(),
+                    "department": p["department"]
+                })
+
+        attendance_rows: List[Dict[str, Any]] = []
+        leave_rows: List[Dict[str, Any]] = []
+        attendance_count = leave_count = 0
+
+        def flush():
+            nonlocal attendance_rows, leave_rows
+            bulk_write(db, Attendance.__table__, attendance_rows)
+            bulk_write(db, Leave.__table__, leave_rows)
+            db.commit()
+            attendance_rows, leave_rows = [], []
+
+        with json_files:
+            for p in people:
+                leaves = scale_leaves(rng, p, start, today + timedelta(days=60), today)
+                leave_days = {
+                    l["start_date"] + timedelta(days=d)
+                    for l in leaves if l["status"] == "approved"
+                    for d in range((l["end_date"] - l["start_date"]).days + 1)
+                }
+
+                for l in leaves:
+                    leave_count += 1
+                    leave_rows.append({"id": uuid.uuid4(), "employee_id": p["employee_id"], **l, "status": l["status"].upper()})
+                    if emit_json:
+                        leaves_json.write({
+                            "id": leave_count,
+                            "user_id": p["legacy_id"],
+                            "start_date": l["start_date"].isoformat(),
+                            "end_date": l["end_date"].isoformat(),
+                            "reason": l["reason"],
+                            "status": l["status"],
+                            "created_at": datetime.combine(l["created_at"], time(9)).isoformat()
+                        })
+
+                for day, check_in, check_out in scale_attendance(rng, p, today, leave_days):
+                    attendance_count += 1
+                    attendance_rows.append({
+                        "id": uuid.uuid4(),
+                        "employee_id": p["employee_id"],
+                        "date": day,
+                        "check_in": check_in,
+                        "check_out": check_out,
+                        "status": "PRESENT"
+                    })
+                    if emit_json:
+                        attendance_json.write({
+                            "id": attendance_count,
+                            "user_id": p["legacy_id"],
+                            "date": day.isoformat(),
+                            "check_in": datetime.combine(day, check_in).isoformat(),
+                            "check_out": datetime.combine(day, check_out).isoformat() if check_out else None
+                        })
+
+                if len(attendance_rows) >= batch_size:
+                    flush()
+            flush()
+        print(f"✅ {attendance_count} attendance records and {leave_count} leave requests created")
+
+        rebuild_daily_summary(db, start, today)
+        for year, month in months_between(start, today):
+            rebuild_monthly_summary(db, year, month, today)
+        print("✅ Attendance rollups rebuilt")
+
+    finally:
+        db.close()
+
+    if emit_json:
+        # The leave store replays its log over the snapshot; start it empty for the new history
+        if os.path.exists(LEAVES_LOG_FILE):
+            os.unlink(LEAVES_LOG_FILE)
+        print(f"✅ Legacy JSON files written to {os.path.dirname(USERS_FILE)}")
+
+    print("🎉 Scale data generated")
+
+
 if __name__ == "__main__":
-    initialize_data()
+    parser = argparse.ArgumentParser(description="Create the schema and demo accounts, or generate scale data")
+    parser.add_argument("--scale", action="store_true", help="generate performance-test data instead of the demo seed")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--departments", type=int, default=8)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="also rewrite the legacy JSON files at the same scale")
+    parser.add_argument("--batch-size", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.scale:
+        generate_scale_data(args.employees, args.departments, args.years, args.seed, args.json, args.batch_size)
+    else:
+        initialize_data()
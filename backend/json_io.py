@@ -0,0 +1,254 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from metrics import json_file_latency
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms only get the in-process lock
+    fcntl = None
+
+
+# =========================
+# ATOMIC WRITES
+# =========================
+def atomic_write_json(file_path: str, data: Any) -> None:
+    """
+    Write JSON to a temp file in the same directory, fsync it and rename it
+    over the target, holding an advisory lock so writers in other processes
+    take turns. Readers see either the old file or the new one, never a
+    truncated one.
+
+    The lock file is `<file>.write.lock`, separate from locks callers hold
+    around their own read-modify-write cycles (LeaveStore takes
+    `<file>.lock` and compacts through this function while holding it).
+    """
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    with json_file_latency.time("write"), open(file_path + ".write.lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory,
+            prefix=os.path.basename(file_path) + ".",
+            suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        # Persist the rename itself
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+
+# =========================
+# WRITE COALESCING
+# =========================
+class _PendingWrite:
+    def __init__(self):
+        self.data: Any = None
+        self.requested = 0     # generation of the newest data handed in
+        self.flushed = 0       # generation covered by the last finished write
+        self.writing = False
+        self.error: Optional[BaseException] = None
+        self.error_generation = 0
+
+
+class CoalescingJSONWriter:
+    """
+    Group commit for whole-document JSON writes.
+
+    Each write replaces the entire file, so when several arrive for the same
+    path while one is pending, only the newest document needs to reach disk.
+    The first caller becomes the leader: it waits `window_seconds` for
+    followers, writes the latest data once, and wakes every caller whose data
+    that write covered. A burst of writes becomes a single fsync, and every
+    caller still returns only after its data (or newer data) is durable.
+    """
+
+    def __init__(self, window_seconds: float = 0.0):
+        self.window_seconds = window_seconds
+        self._cond = threading.Condition()
+        self._pending: Dict[str, _PendingWrite] = {}
+        self.requests = 0
+        self.flushes = 0
+
+    def write(self, file_path: str, data: Any) -> None:
+        with self._cond:
+            pending = self._pending.setdefault(file_path, _PendingWrite())
+            pending.requested += 1
+            pending.data = data
+            generation = pending.requested
+            self.requests += 1
+
+            if pending.writing:
+                while pending.flushed < generation:
+                    self._cond.wait()
+                if pending.error is not None and pending.error_generation >= generation:
+                    raise pending.error
+                return
+
+            pending.writing = True
+
+        if self.window_seconds > 0:
+            time.sleep(self.window_seconds)
+        self._lead(file_path, pending, generation)
+
+    def _lead(self, file_path: str, pending: _PendingWrite, generation: int) -> None:
+        own_error = None
+        while True:
+            with self._cond:
+                data = pending.data
+                target = pending.requested
+
+            error = None
+            try:
+                atomic_write_json(file_path, data)
+            except BaseException as exc:
+                error = exc
+
+            with self._cond:
+                self.flushes += 1
+                pending.flushed = target
+                if error is not None:
+                    pending.error = error
+                    pending.error_generation = target
+                    if generation <= target:
+                        own_error = error
+                self._cond.notify_all()
+
+                if pending.requested == target:
+                    pending.writing = False
+                    pending.data = None
+                    break
+
+        if own_error is not None:
+            raise own_error
+
+
+# =========================
+# PARSED DOCUMENT CACHE
+# =========================
+class _CachedDocument:
+    def __init__(self, signature: tuple, data: Any, size: int):
+        self.signature = signature
+        self.data = data
+        self.size = size
+        self.derived: Dict[str, Any] = {}
+
+
+class JSONDocumentCache:
+    """
+    Parsed JSON documents shared across requests, keyed by path.
+
+    An entry is reused only while the file's (mtime, size, inode) still match
+    the ones it was parsed from, so writes from any process are picked up on
+    the next read. Entries are evicted least-recently-used once the on-disk
+    size of the cached files exceeds `max_bytes`. Cached documents are shared:
+    callers must treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _CachedDocument]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _signature(stat: os.stat_result) -> tuple:
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _document(self, file_path: str) -> Optional[_CachedDocument]:
+        try:
+            signature = self._signature(os.stat(file_path))
+        except FileNotFoundError:
+            self.invalidate(file_path)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(file_path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Parse outside the lock; fstat the handle we read so the signature matches the content
+        try:
+            with json_file_latency.time("read"), open(file_path, "r") as f:
+                stat = os.fstat(f.fileno())
+                data = json.load(f)
+        except FileNotFoundError:
+            self.invalidate(file_path)
+            return None
+
+        entry = _CachedDocument(self._signature(stat), data, stat.st_size)
+        self._store(file_path, entry)
+        return entry
+
+    def _store(self, file_path: str, entry: _CachedDocument) -> None:
+        with self._lock:
+            previous = self._entries.pop(file_path, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+            if entry.size > self.max_bytes:
+                return
+
+            self._entries[file_path] = entry
+            self._total_bytes += entry.size
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.size
+                self.evictions += 1
+
+    def load(self, file_path: str) -> Any:
+        """Parsed content of file_path, or None if it does not exist"""
+        entry = self._document(file_path)
+        return entry.data if entry is not None else None
+
+    def derived(self, file_path: str, key: str, builder: Callable[[Any], Any], default: Any = None) -> Any:
+        """builder(data), computed once per version of the file and cached alongside it"""
+        entry = self._document(file_path)
+        if entry is None:
+            return builder(default)
+        if key not in entry.derived:
+            entry.derived[key] = builder(entry.data)
+        return entry.derived[key]
+
+    def invalidate(self, file_path: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(file_path, None)
+            if entry is not None:
+                self._total_bytes -= entry.size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes
+            }
@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms only get the in-process lock
+    fcntl = None
+
+from config import LEAVES_FILE, LEAVES_LOG_FILE, LEAVES_COMPACT_EVERY
+from utils import read_json_file, write_json_file
+from metrics import json_file_latency
+
+
+class LeaveStore:
+    """
+    Leave records kept as a JSON snapshot plus an append-only log of changes.
+
+    Every change appends one line to the log, so writes cost O(1) instead of
+    rewriting the whole file. In-memory indexes by id, user and status answer
+    reads without scanning history. The log is folded into the snapshot every
+    `compact_every` appends, and the snapshot stays a plain JSON list that the
+    legacy readers understand.
+
+    Several worker processes can share the files: changes are serialized by an
+    advisory lock, and each process replays the log entries it has not seen
+    before it reads or writes.
+    """
+
+    def __init__(self, snapshot_path: str, log_path: str, compact_every: int = 1000):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.lock_path = snapshot_path + ".lock"
+        self.compact_every = compact_every
+
+        self._mutex = threading.RLock()
+        self._loaded = False
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+        self._appends_since_compact = 0
+        self._reset()
+
+    # =========================
+    # INDEXES
+    # =========================
+    def _reset(self) -> None:
+        self._records: Dict[int, Dict[str, Any]] = {}
+        self._by_user: Dict[Any, Dict[int, None]] = {}
+        self._by_status: Dict[str, Dict[int, None]] = {}
+        self._next_id = 1
+
+    def _index(self, record: Dict[str, Any]) -> None:
+        leave_id = int(record["id"])
+        previous = self._records.get(leave_id)
+        if previous is not None:
+            self._by_status.get(previous.get("status"), {}).pop(leave_id, None)
+
+        self._records[leave_id] = record
+        self._by_user.setdefault(record.get("user_id"), {})[leave_id] = None
+        self._by_status.setdefault(record.get("status"), {})[leave_id] = None
+        self._next_id = max(self._next_id, leave_id + 1)
+
+    # =========================
+    # FILE SYNC
+    # =========================
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        with self._mutex:
+            if fcntl is None:
+                self._refresh()
+                yield
+                return
+
+            os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    self._refresh()
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Replay log lines written since the last call, reloading if the log was compacted"""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            stat = None
+
+        inode = stat.st_ino if stat else None
+        if not self._loaded or inode != self._log_inode or (stat and stat.st_size < self._log_offset):
+            self._reset()
+            for record in read_json_file(self.snapshot_path):
+                self._index(record)
+            self._loaded = True
+            self._log_inode = inode
+            self._log_offset = 0
+            self._appends_since_compact = 0
+
+        if stat is None or stat.st_size == self._log_offset:
+            return
+
+        with json_file_latency.time("log_replay"), open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a concurrent append that is not finished yet
+                self._log_offset += len(line)
+                self._appends_since_compact += 1
+                self._index(json.loads(line))
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = (json.dumps(record, default=str) + "\n").encode()
+        with json_file_latency.time("log_append"), open(self.log_path, "ab") as f:
+            # Under the exclusive lock an unterminated tail can only be a crashed append
+            if f.tell() > self._log_offset:
+                f.truncate(self._log_offset)
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            if self._log_inode is None:
+                self._log_inode = os.fstat(f.fileno()).st_ino
+
+        self._log_offset += len(line)
+        self._index(record)
+        self._appends_since_compact += 1
+
+        if self._appends_since_compact >= self.compact_every:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Write the snapshot, then swap in an empty log (new inode) so other processes reload"""
+        write_json_file(self.snapshot_path, list(self._records.values()))
+
+        tmp_path = self.log_path + ".tmp"
+        open(tmp_path, "wb").close()
+        os.replace(tmp_path, self.log_path)
+
+        self._log_inode = os.stat(self.log_path).st_ino
+        self._log_offset = 0
+        self._appends_since_compact = 0
+
+    # =========================
+    # PUBLIC API
+    # =========================
+    def create(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        with self._locked(exclusive=True):
+            record = {"id": self._next_id, **fields}
+            self._append(record)
+            return record
+
+    def update(self, leave_id: int, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._locked(exclusive=True):
+            current = self._records.get(leave_id)
+            if current is None:
+                return None
+            record = {**current, **changes}
+            self._append(record)
+            return record
+
+    def get(self, leave_id: int) -> Optional[Dict[str, Any]]:
+        with self._locked(exclusive=False):
+            return self._records.get(leave_id)
+
+    def for_user(self, user_id: Any) -> List[Dict[str, Any]]:
+        with self._locked(exclusive=False):
+            return [self._records[i] for i in self._by_user.get(user_id, {})]
+
+    def with_status(self, status: str) -> List[Dict[str, Any]]:
+        with self._locked(exclusive=False):
+            return [self._records[i] for i in self._by_status.get(status, {})]
+
+    def all(self) -> List[Dict[str, Any]]:
+        with self._locked(exclusive=False):
+            return list(self._records.values())
+
+    def version(self) -> str:
+        """Changes whenever a record is appended or the log is compacted, in any process"""
+        with self._locked(exclusive=False):
+            return f"{self._log_inode or 0}.{self._log_offset}"
+
+    def compact(self) -> None:
+        with self._locked(exclusive=True):
+            self._compact()
+
+
+leave_store = LeaveStore(LEAVES_FILE, LEAVES_LOG_FILE, compact_every=LEAVES_COMPACT_EVERY)
@@ -0,0 +1,92 @@
+import asyncio
+import itertools
+import json
+import threading
+from typing import Any, Dict, Optional, Set
+
+from config import LIVE_UPDATES_MAX_QUEUED
+
+
+class Subscription:
+    """
+    One connected client: a bounded queue drained by its SSE response.
+
+    Offers run on the subscriber's event loop. When the client falls
+    `max_queued` events behind, the backlog is dropped and replaced by a
+    single "resync" event telling it to re-fetch, so a slow consumer costs
+    bounded memory and never slows the publisher or other clients.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queued: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"id": event["id"], "type": "resync", "data": {}})
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LiveUpdatePublisher:
+    """
+    In-process fan-out of committed changes to connected admin dashboards.
+
+    publish() may be called from request threads or from the event loop; each
+    event is handed to every subscriber's loop without waiting on any of them.
+    """
+
+    def __init__(self, max_queued: int = 100):
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queued)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            event = {"id": next(self._ids), "type": event_type, "data": data}
+            subscribers = list(self._subscribers)
+            self.published += 1
+
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # Loop already closed: the connection is gone
+                self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped": sum(s.dropped for s in self._subscribers)
+            }
+
+
+def sse_message(event: Dict[str, Any]) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+publisher = LiveUpdatePublisher(max_queued=LIVE_UPDATES_MAX_QUEUED)
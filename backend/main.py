@@ -1,16 +1,40 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
-from routes import auth, attendance, leaves, users, dashboard
-from init_data import initialize_data
+from config import (
+    ASYNC_DB, COMPRESSION_MIN_BYTES, INIT_DATA_ON_STARTUP, SQL_INSTRUMENTATION, SQL_QUERY_BUDGET,
+    SQL_REPEAT_THRESHOLD, database_engines
+)
+from routes import auth, attendance, leaves, users, dashboard, live, admin
+from utils import principal_cache, password_pool
+from live_updates import publisher
+from etags import NotModified
+from compression import CompressionMiddleware
+from metrics import MetricsMiddleware, Gauge, registry
+
+# ASYNC_DB serves the SQLAlchemy routes from AsyncSession handlers on the event loop
+if ASYNC_DB:
+    from routes import auth_async as auth, attendance_async as attendance, users_async as users
 
-initialize_data()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs per started worker rather than on import (reloads, test clients, scripts);
+    # once the database is marked as set up this is a single lookup
+    if INIT_DATA_ON_STARTUP:
+        from init_data import ensure_initialized
+        await run_in_threadpool(ensure_initialized)
+    yield
 
 app = FastAPI(
     title="Smart Attendance & Leave Management API",
     description="Production-grade attendance and leave management system",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -19,13 +43,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-DB-Queries", "X-DB-Time-Ms", "X-DB-Repeated"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+if SQL_INSTRUMENTATION:
+    from query_stats import SQLInstrumentationMiddleware
+    app.add_middleware(
+        SQLInstrumentationMiddleware,
+        query_budget=SQL_QUERY_BUDGET,
+        repeat_threshold=SQL_REPEAT_THRESHOLD
+    )
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers={"ETag": exc.etag})
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(attendance.router, prefix="/api/attendance", tags=["attendance"])
 app.include_router(leaves.router, prefix="/api/leaves", tags=["leaves"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
+app.include_router(live.router, prefix="/api/live", tags=["live"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/")
 def read_root():
@@ -33,7 +73,42 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "principal_cache": principal_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "live_updates": publisher.stats()
+    }
+
+# =========================
+# METRICS
+# =========================
+def pool_gauge(name: str, help: str, read) -> Gauge:
+    """One sample per SQLAlchemy engine, skipped for pools without the counter (NullPool, StaticPool)"""
+    def collect():
+        return [
+            ((label,), read(e.pool))
+            for label, e in database_engines().items() if hasattr(e.pool, "checkedout")
+        ]
+    return registry.register(Gauge(name, help, ("engine",), collect))
+
+pool_gauge("db_pool_size", "Configured connections kept in the pool", lambda pool: pool.size())
+pool_gauge("db_pool_checked_out", "Connections currently lent to sessions", lambda pool: pool.checkedout())
+pool_gauge("db_pool_overflow", "Connections open beyond pool_size (negative while below it)", lambda pool: pool.overflow())
+
+for key, help in (
+    ("running", "bcrypt calls executing on the password pool"),
+    ("queued", "bcrypt calls waiting for a password pool worker"),
+    ("rejected", "bcrypt calls refused with 503 since start"),
+):
+    registry.register(Gauge(
+        f"password_pool_{key}", help, (),
+        lambda key=key: [((), password_pool.stats()[key])]
+    ))
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Date, Time
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, Date, Time, Uuid, Index, Integer
 from datetime import datetime
 import uuid
 
@@ -9,11 +8,11 @@ from config import Base
 class Employee(Base):
     __tablename__ = "employees"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     employee_id = Column(String, unique=True, index=True, nullable=False)
     full_name = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False)
-    department = Column(String)
+    department = Column(String, index=True)
     role = Column(String, default="EMPLOYEE")
     is_active = Column(Boolean, default=True)
 
@@ -21,7 +20,7 @@ class Employee(Base):
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     employee_id = Column(String, unique=True, nullable=False)
     password_hash = Column(String, nullable=False)
 
@@ -29,18 +28,70 @@ class User(Base):
 class Attendance(Base):
     __tablename__ = "attendance"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     employee_id = Column(String, nullable=False)
     date = Column(Date, nullable=False)
     check_in = Column(Time, nullable=True)
     check_out = Column(Time, nullable=True)
     status = Column(String, default="ABSENT")
 
+    __table_args__ = (
+        # One row per employee per day; also the conflict target for check-in upserts
+        Index("uq_attendance_employee_date", "employee_id", "date", unique=True),
+        # Keyset pagination walks (date, id) backwards; status filters get their own path
+        Index("ix_attendance_date_id", "date", "id"),
+        Index("ix_attendance_status_date_id", "status", "date", "id"),
+    )
+
+
+class DailyAttendanceSummary(Base):
+    """Per-day, per-department attendance counters kept in step with check-in/check-out"""
+    __tablename__ = "daily_attendance_summary"
+
+    date = Column(Date, primary_key=True)
+    department = Column(String, primary_key=True)
+    present = Column(Integer, nullable=False, default=0)
+    checked_in = Column(Integer, nullable=False, default=0)
+    absent = Column(Integer, nullable=False, default=0)
+
+
+class MonthlyAttendanceSummary(Base):
+    """Per-employee attendance counters for one calendar month"""
+    __tablename__ = "monthly_attendance_summary"
+
+    employee_id = Column(String, primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    records = Column(Integer, nullable=False, default=0)
+    present = Column(Integer, nullable=False, default=0)
+    checked_in = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_monthly_summary_year_month", "year", "month"),
+    )
+
+
+class MonthlySummaryPeriod(Base):
+    """Months whose summaries have been computed; frozen once the month has closed"""
+    __tablename__ = "monthly_summary_periods"
+
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    frozen = Column(Boolean, nullable=False, default=False)
+
+
+class CollectionVersion(Base):
+    """Counter bumped in the same transaction as every write to a collection; backs list ETags"""
+    __tablename__ = "collection_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
 
 class Leave(Base):
     __tablename__ = "leaves"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     employee_id = Column(String, nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List
+
+
+class PoolSaturated(Exception):
+    """Raised when more hashing work is pending than the pool admits"""
+
+
+class PasswordHashPool:
+    """
+    Size-limited executor for bcrypt work.
+
+    bcrypt releases the GIL while hashing, so a thread pool gives real
+    parallelism without the pickling cost of a process pool. At most
+    `max_pending` calls may be running or queued; beyond that, submit()
+    fails fast instead of tying up more request workers.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.running = 0
+        self.wait_seconds = 0.0
+        self.busy_seconds = 0.0
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturated("Password hashing queue is full")
+
+        with self._lock:
+            self.submitted += 1
+        queued_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                self.wait_seconds += started_at - queued_at
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.busy_seconds += time.perf_counter() - started_at
+                self._slots.release()
+
+        try:
+            return self._executor.submit(task)
+        except RuntimeError:
+            self._slots.release()
+            raise
+
+    def run(self, fn: Callable, *args: Any) -> Any:
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable, *args: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def map(self, fn: Callable, items: Iterable[Any], window: int) -> List[Any]:
+        """
+        fn(item) for every item, in order, keeping at most `window` calls in
+        the pool so a batch job leaves room for interactive requests. When the
+        pool is full, wait for our oldest call instead of failing; raise
+        PoolSaturated only if none of ours are in flight to wait on.
+        """
+        results: List[Any] = []
+        in_flight: deque = deque()
+
+        for item in items:
+            while True:
+                if len(in_flight) >= window:
+                    results.append(in_flight.popleft().result())
+                try:
+                    in_flight.append(self.submit(fn, item))
+                    break
+                except PoolSaturated:
+                    if not in_flight:
+                        raise
+                    results.append(in_flight.popleft().result())
+
+        while in_flight:
+            results.append(in_flight.popleft().result())
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self.submitted - self.completed
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "running": self.running,
+                "queued": pending - self.running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds": round(self.wait_seconds, 6),
+                "busy_seconds": round(self.busy_seconds, 6)
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,153 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import database_engines
+
+logger = logging.getLogger(__name__)
+
+
+class RequestQueries:
+    """SQL statements one request sent, with the time spent waiting on them"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """(statement, times) for statements sent at least `threshold` times, most frequent first"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+# Set by SQLInstrumentationMiddleware; threadpool calls inherit it, so sync routes are counted too
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+# =========================
+# ENGINE HOOKS
+# =========================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_queries.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = current_queries.get()
+    if queries is None:
+        return
+    started = conn.info.get("query_started_at")
+    if started:
+        queries.seconds += time.perf_counter() - started.pop()
+    queries.count += 1
+    queries.statements[statement] += 1
+
+
+def instrumented_engines() -> List[Engine]:
+    """Primary and replica engines, sync and (behind AsyncEngine) async"""
+    return list(database_engines().values())
+
+
+def install() -> None:
+    for target in instrumented_engines():
+        if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+            event.listen(target, "before_cursor_execute", _before_cursor_execute)
+            event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+# =========================
+# PER-REQUEST REPORTING
+# =========================
+class SQLInstrumentationMiddleware:
+    """
+    Count the queries and database time of each request. The totals go out
+    as X-DB-Queries / X-DB-Time-Ms / X-DB-Repeated response headers, and a
+    warning is logged when a request exceeds its query budget or sends the
+    same statement `repeat_threshold` times or more (the N+1 pattern).
+
+    Headers cover the queries run before the response started; streamed
+    responses (exports, SSE) are only reported in the log.
+    """
+
+    def __init__(self, app: ASGIApp, query_budget: int, repeat_threshold: int):
+        self.app = app
+        self.query_budget = query_budget
+        self.repeat_threshold = repeat_threshold
+        install()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(queries.count)
+                headers["X-DB-Time-Ms"] = f"{queries.seconds * 1000:.2f}"
+                headers["X-DB-Repeated"] = str(max(queries.statements.values(), default=0))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
+            self.report(scope, queries)
+
+    def report(self, scope: Scope, queries: RequestQueries) -> None:
+        route = getattr(scope.get("route"), "path", scope["path"])
+        repeated = queries.repeated(self.repeat_threshold)
+        if repeated:
+            sql, times = repeated[0]
+            logger.warning(
+                "%s %s: possible N+1, same statement sent %d times (%d queries, %.1f ms): %s",
+                scope["method"], route, times, queries.count, queries.seconds * 1000, " ".join(sql.split())[:200]
+            )
+        elif queries.count > self.query_budget:
+            logger.warning(
+                "%s %s: %d queries (%.1f ms) exceeds the budget of %d",
+                scope["method"], route, queries.count, queries.seconds * 1000, self.query_budget
+            )
+
+
+# =========================
+# TEST HELPER
+# =========================
+@contextmanager
+def assert_max_queries(limit: int, *engines: Engine) -> Iterator[List[str]]:
+    """
+    Fail if the block sends more than `limit` statements. Listens on the
+    engines directly, so it works around TestClient calls whatever thread
+    the app runs in, and without SQL_INSTRUMENTATION:
+
+        with assert_max_queries(2):
+            client.post("/api/auth/login", json=credentials)
+    """
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    targets = engines or instrumented_engines()
+    for target in targets:
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", record)
+
+    if len(statements) > limit:
+        listing = "\n".join(f"  {i}. {' '.join(sql.split())}" for i, sql in enumerate(statements, 1))
+        raise AssertionError(f"Expected at most {limit} queries, {len(statements)} were sent:\n{listing}")
@@ -0,0 +1,274 @@
+import argparse
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from models import (
+    Attendance, Employee, DailyAttendanceSummary,
+    MonthlyAttendanceSummary, MonthlySummaryPeriod
+)
+from dashboard_queries import count_if, month_bounds, CHECKED_IN, PRESENT
+from utils import dialect_insert
+
+# Employees without a department are counted under the same key the dashboard shows
+DEPARTMENT = func.coalesce(Employee.department, "Unknown")
+
+
+def department_headcount():
+    """Correlated COUNT of employees sharing the outer Employee row's department"""
+    colleague = Employee.__table__.alias("colleague")
+    return (
+        select(func.count())
+        .where(func.coalesce(colleague.c.department, "Unknown") == DEPARTMENT)
+        .scalar_subquery()
+    )
+
+
+# =========================
+# INCREMENTAL UPDATES
+# =========================
+def daily_summary_statement(
+    dialect_name: str,
+    employee_id: str,
+    day: date,
+    present: int = 0,
+    checked_in: int = 0
+):
+    """
+    Add present/checked_in deltas to the employee's department row for `day`.
+    Runs inside the check-in/check-out transaction so the rollup commits with
+    the attendance change. A new row starts from the department headcount.
+    """
+    rows = select(
+        literal(day),
+        DEPARTMENT,
+        literal(present),
+        literal(checked_in),
+        department_headcount() - checked_in
+    ).where(Employee.employee_id == employee_id)
+
+    stmt = dialect_insert(dialect_name)(DailyAttendanceSummary).from_select(
+        ["date", "department", "present", "checked_in", "absent"],
+        rows
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyAttendanceSummary.date, DailyAttendanceSummary.department],
+        set_={
+            "present": DailyAttendanceSummary.present + stmt.excluded.present,
+            "checked_in": DailyAttendanceSummary.checked_in + stmt.excluded.checked_in,
+            "absent": DailyAttendanceSummary.absent - stmt.excluded.checked_in
+        }
+    )
+
+
+def monthly_summary_statement(dialect_name: str, employee_id: str, day: date):
+    """Recount the employee's month containing `day` from its (at most 31) attendance rows"""
+    month_start, month_end = month_bounds(day.year, day.month)
+    rows = select(
+        literal(employee_id),
+        literal(day.year),
+        literal(day.month),
+        func.count(),
+        count_if(PRESENT),
+        count_if(CHECKED_IN)
+    ).where(
+        Attendance.employee_id == employee_id,
+        Attendance.date >= month_start,
+        Attendance.date < month_end
+    )
+
+    stmt = dialect_insert(dialect_name)(MonthlyAttendanceSummary).from_select(
+        ["employee_id", "year", "month", "records", "present", "checked_in"],
+        rows
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[
+            MonthlyAttendanceSummary.employee_id,
+            MonthlyAttendanceSummary.year,
+            MonthlyAttendanceSummary.month
+        ],
+        set_={
+            "records": stmt.excluded.records,
+            "present": stmt.excluded.present,
+            "checked_in": stmt.excluded.checked_in
+        }
+    )
+
+
+def rollup_statements(
+    dialect_name: str,
+    employee_id: str,
+    day: date,
+    present: int = 0,
+    checked_in: int = 0
+) -> List:
+    """Every rollup write for one attendance change, to run before its commit"""
+    return [
+        daily_summary_statement(dialect_name, employee_id, day, present=present, checked_in=checked_in),
+        monthly_summary_statement(dialect_name, employee_id, day),
+    ]
+
+
+# =========================
+# REBUILD
+# =========================
+def daily_refresh_statements(start_date: Optional[date] = None, end_date: Optional[date] = None) -> List:
+    """DELETE + INSERT ... SELECT recomputing the daily rollup for [start_date, end_date]"""
+    clear = delete(DailyAttendanceSummary)
+    if start_date:
+        clear = clear.where(DailyAttendanceSummary.date >= start_date)
+    if end_date:
+        clear = clear.where(DailyAttendanceSummary.date <= end_date)
+
+    daily = (
+        select(
+            Attendance.date.label("date"),
+            DEPARTMENT.label("department"),
+            count_if(PRESENT).label("present"),
+            count_if(CHECKED_IN).label("checked_in"),
+        )
+        .join(Employee, Attendance.employee_id == Employee.employee_id)
+        .where(CHECKED_IN)
+        .group_by(Attendance.date, DEPARTMENT)
+    )
+    if start_date:
+        daily = daily.where(Attendance.date >= start_date)
+    if end_date:
+        daily = daily.where(Attendance.date <= end_date)
+    daily = daily.subquery()
+
+    headcounts = (
+        select(DEPARTMENT.label("department"), func.count().label("headcount"))
+        .group_by(DEPARTMENT)
+        .subquery()
+    )
+
+    fill = insert(DailyAttendanceSummary).from_select(
+        ["date", "department", "present", "checked_in", "absent"],
+        select(
+            daily.c.date,
+            daily.c.department,
+            daily.c.present,
+            daily.c.checked_in,
+            headcounts.c.headcount - daily.c.checked_in
+        ).join(headcounts, headcounts.c.department == daily.c.department)
+    )
+    return [clear, fill]
+
+
+def monthly_refresh_statements(year: int, month: int, employee_ids: Optional[List[str]] = None) -> List:
+    """DELETE + INSERT ... SELECT recomputing one month, optionally for some employees only"""
+    month_start, month_end = month_bounds(year, month)
+
+    clear = delete(MonthlyAttendanceSummary).where(
+        MonthlyAttendanceSummary.year == year,
+        MonthlyAttendanceSummary.month == month
+    )
+    monthly = (
+        select(
+            Attendance.employee_id,
+            literal(year),
+            literal(month),
+            func.count(),
+            count_if(PRESENT),
+            count_if(CHECKED_IN)
+        )
+        .where(Attendance.date >= month_start, Attendance.date < month_end)
+        .group_by(Attendance.employee_id)
+    )
+    if employee_ids is not None:
+        clear = clear.where(MonthlyAttendanceSummary.employee_id.in_(employee_ids))
+        monthly = monthly.where(Attendance.employee_id.in_(employee_ids))
+
+    fill = insert(MonthlyAttendanceSummary).from_select(
+        ["employee_id", "year", "month", "records", "present", "checked_in"],
+        monthly
+    )
+    return [clear, fill]
+
+
+def rebuild_daily_summary(
+    db: Session,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> int:
+    """Recompute the rollup from attendance for [start_date, end_date]; returns the rows written"""
+    clear, fill = daily_refresh_statements(start_date, end_date)
+    db.execute(clear)
+    written = db.execute(fill).rowcount
+    db.commit()
+    return written
+
+
+def rebuild_monthly_summary(db: Session, year: int, month: int, today: Optional[date] = None) -> int:
+    """Recompute one month from attendance and freeze it if it has closed; returns the rows written"""
+    today = today or datetime.now().date()
+
+    clear, fill = monthly_refresh_statements(year, month)
+    db.execute(clear)
+    written = db.execute(fill).rowcount
+
+    period = db.get(MonthlySummaryPeriod, (year, month))
+    if period is None:
+        period = MonthlySummaryPeriod(year=year, month=month)
+        db.add(period)
+    period.frozen = month_bounds(year, month)[1] <= today
+
+    db.commit()
+    return written
+
+
+def ensure_monthly_summary(db: Session, year: int, month: int, today: Optional[date] = None) -> bool:
+    """
+    Make the month's summary rows readable. Frozen months are used as stored;
+    the current month is kept current by check-in/check-out, so it is only
+    computed once. A month that has closed since then is recomputed one last
+    time and frozen. Returns whether it rebuilt the month.
+    """
+    today = today or datetime.now().date()
+    period = db.get(MonthlySummaryPeriod, (year, month))
+
+    if period is not None and (period.frozen or month_bounds(year, month)[1] > today):
+        return False
+    rebuild_monthly_summary(db, year, month, today)
+    return True
+
+
+def months_between(start: date, end: date) -> Iterator[Tuple[int, int]]:
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+if __name__ == "__main__":
+    from config import Base, engine, SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild attendance rollup tables from the attendance table")
+    parser.add_argument("--start-date", type=date.fromisoformat)
+    parser.add_argument("--end-date", type=date.fromisoformat)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine, tables=[
+        DailyAttendanceSummary.__table__,
+        MonthlyAttendanceSummary.__table__,
+        MonthlySummaryPeriod.__table__
+    ])
+    db = SessionLocal()
+    try:
+        written = rebuild_daily_summary(db, args.start_date, args.end_date)
+        print(f"✅ daily_attendance_summary rebuilt: {written} rows")
+
+        first, last = db.query(func.min(Attendance.date), func.max(Attendance.date)).one()
+        if first is not None:
+            start = max(first, args.start_date) if args.start_date else first
+            end = min(last, args.end_date) if args.end_date else last
+            written = sum(
+                rebuild_monthly_summary(db, year, month)
+                for year, month in months_between(start, end)
+            )
+            print(f"✅ monthly_attendance_summary rebuilt: {written} rows")
+    finally:
+        db.close()
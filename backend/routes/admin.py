@@ -0,0 +1,147 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from config import DASHBOARD_BACKEND
+from utils import require_admin, get_read_db
+from routes.attendance import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, attendance_page_statement, attendance_row, encode_cursor
+from routes.users import employee_list_statement, employee_response
+from routes.leaves import pending_leaves_with_names
+from routes.dashboard import dashboard_stats, attendance_chart, employee_performance
+from fast_json import json_response
+
+router = APIRouter()
+
+
+# =========================
+# SECTIONS
+# =========================
+def users_section(db: Session, **_) -> list:
+    """Same rows and payload as /api/users"""
+    return [employee_response(row) for row in db.execute(employee_list_statement()).all()]
+
+
+def attendance_section(db: Session, limit: int, **_) -> dict:
+    """First page of /api/attendance/all; pass next_cursor there for more"""
+    records = db.execute(attendance_page_statement(limit=limit)).all()
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_cursor(last.date, last.id)
+
+    return {
+        "items": [attendance_row(row) for row in records],
+        "next_cursor": next_cursor
+    }
+
+
+def leaves_section(**_) -> list:
+    return pending_leaves_with_names()
+
+
+def stats_section(db: Session, **_) -> dict:
+    return dashboard_stats(db)
+
+
+def chart_section(db: Session, days: int, **_) -> list:
+    return attendance_chart(db, days)
+
+
+def performance_section(db: Session, **_) -> list:
+    return employee_performance(db)
+
+
+# name -> (loader, needs the database session)
+SECTIONS: Dict[str, tuple] = {
+    "users": (users_section, True),
+    "attendance": (attendance_section, True),
+    "leaves": (leaves_section, False),
+    "stats": (stats_section, DASHBOARD_BACKEND == "sql"),
+    "chart": (chart_section, DASHBOARD_BACKEND == "sql"),
+    "performance": (performance_section, DASHBOARD_BACKEND == "sql"),
+}
+
+
+# =========================
+# FIELD SELECTION
+# =========================
+def parse_fields(fields: Optional[str]) -> Dict[str, Set[str]]:
+    """Parse "users.name,users.email,stats.today" into {"users": {"name", "email"}, "stats": {"today"}}"""
+    selected: Dict[str, Set[str]] = {}
+    for item in filter(None, (f.strip() for f in (fields or "").split(","))):
+        section, _, field = item.partition(".")
+        if section not in SECTIONS or not field:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid field selector: {item}"
+            )
+        selected.setdefault(section, set()).add(field)
+    return selected
+
+
+def project(value: Any, keep: Set[str]) -> Any:
+    """Keep only the selected keys of a dict, of each dict in a list, or of a page's items"""
+    if isinstance(value, list):
+        return [project(item, keep) for item in value]
+    if isinstance(value, dict):
+        if "items" in value and "next_cursor" in value:
+            return {**value, "items": project(value["items"], keep)}
+        return {k: v for k, v in value.items() if k in keep}
+    return value
+
+
+def unknown_section_error(names: List[str]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Unknown sections: {', '.join(names)}. Choose from {', '.join(SECTIONS)}"
+    )
+
+
+# =========================
+# BOOTSTRAP (ADMIN)
+# =========================
+@router.get("/bootstrap")
+async def admin_bootstrap(
+    sections: str = Query(",".join(SECTIONS)),
+    fields: Optional[str] = None,
+    days: int = Query(7, ge=1, le=366),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    admin=Depends(require_admin),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Everything the admin panel and dashboard load on mount, in one response.
+    Authentication and the session are shared by every section. Sections that
+    read the database run one after another on that session, while the rest
+    (leave store, JSON-backed dashboard) run concurrently beside them.
+    """
+    requested = list(dict.fromkeys(s.strip() for s in sections.split(",") if s.strip()))
+    unknown = [name for name in requested if name not in SECTIONS]
+    if unknown:
+        raise unknown_section_error(unknown)
+    selected = parse_fields(fields)
+
+    options = {"db": db, "days": days, "limit": limit}
+    db_sections = [name for name in requested if SECTIONS[name][1]]
+    other_sections = [name for name in requested if not SECTIONS[name][1]]
+
+    def load_one(name: str) -> Any:
+        return SECTIONS[name][0](**options)
+
+    def load(names: List[str]) -> Dict[str, Any]:
+        return {name: load_one(name) for name in names}
+
+    db_results, *other_results = await asyncio.gather(
+        run_in_threadpool(load, db_sections),
+        *(run_in_threadpool(load_one, name) for name in other_sections)
+    )
+    results = {**db_results, **dict(zip(other_sections, other_results))}
+
+    return json_response({
+        name: project(results[name], selected[name]) if name in selected else results[name]
+        for name in requested
+    })
@@ -1,50 +1,272 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_, update
 from sqlalchemy.orm import Session
-from datetime import date, datetime
+from datetime import date, datetime, time
+from typing import Optional, Tuple
+import base64
+import csv
+import io
+import json
+import uuid
 
-from utils import get_current_user, require_admin, get_db
+from config import ReadSessionLocal
+from utils import get_current_user, require_admin, require_device, get_db, get_read_db, dialect_insert
+from etags import bump_version, collection_etag
 from models import Attendance, Employee
+from rollups import rollup_statements
+from attendance_ingest import (
+    AttendanceEventBatch, fold_events, known_employees_statement,
+    attendance_upsert_statement, upsert_rows, rollup_refresh_statements, ingest_response, ingested_event
+)
+from live_updates import publisher
+from fast_json import json_response
 
-router = APIRouter(prefix="/api/attendance", tags=["Attendance"])
+router = APIRouter(tags=["Attendance"])
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
 
 
 # =========================
-# CHECK-IN
+# STATEMENTS
 # =========================
-@router.post("/check-in")
-def check_in(
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    today = date.today()
+def check_in_statement(dialect_name: str, employee_id: str, today: date, now: time):
+    """INSERT today's row, or fill check_in on a row that has none; RETURNING is empty if already checked in"""
+    stmt = dialect_insert(dialect_name)(Attendance).values(
+        employee_id=employee_id,
+        date=today,
+        check_in=now,
+        status="PRESENT"
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[Attendance.employee_id, Attendance.date],
+        set_={"check_in": stmt.excluded.check_in},
+        where=Attendance.check_in.is_(None)
+    ).returning(Attendance.id)
+
 
-    record = (
-        db.query(Attendance)
-        .filter(
-            Attendance.employee_id == current_user.employee_id,
-            Attendance.date == today
+def check_out_statement(employee_id: str, today: date, now: time):
+    """UPDATE today's open row; RETURNING is empty if not checked in or already checked out"""
+    return (
+        update(Attendance)
+        .where(
+            Attendance.employee_id == employee_id,
+            Attendance.date == today,
+            Attendance.check_in.isnot(None),
+            Attendance.check_out.is_(None)
         )
-        .first()
+        .values(check_out=now)
+        .returning(Attendance.id)
+        .execution_options(synchronize_session=False)
     )
 
-    if record and record.check_in:
+
+def check_out_error(record) -> HTTPException:
+    """Explain why a check-out UPDATE matched no row"""
+    if not record or not record.check_in:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You must check in first"
+        )
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Already checked out today"
+    )
+
+
+def encode_cursor(record_date: date, record_id: uuid.UUID) -> str:
+    """Opaque keyset cursor for the (date desc, id desc) ordering"""
+    raw = f"{record_date.isoformat()}|{record_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[date, uuid.UUID]:
+    try:
+        record_date, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return date.fromisoformat(record_date), uuid.UUID(record_id)
+    except (ValueError, UnicodeDecodeError):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Already checked in today"
+            detail="Invalid cursor"
         )
 
+
+# Plain columns instead of (Attendance, Employee) entities: rows skip ORM
+# identity-map bookkeeping and serialize straight from the tuple
+ATTENDANCE_ROW_COLUMNS = (
+    Attendance.id,
+    Employee.employee_id,
+    Employee.full_name.label("name"),
+    Employee.department,
+    Attendance.date,
+    Attendance.check_in,
+    Attendance.check_out,
+    Attendance.status,
+)
+
+ATTENDANCE_RECORD_COLUMNS = (
+    Attendance.id,
+    Attendance.employee_id,
+    Attendance.date,
+    Attendance.check_in,
+    Attendance.check_out,
+    Attendance.status,
+)
+
+
+def attendance_page_statement(
+    limit: int,
+    cursor: Optional[Tuple[date, uuid.UUID]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """One page of Attendance joined to Employee, plus one extra row to detect a next page"""
+    stmt = (
+        select(*ATTENDANCE_ROW_COLUMNS)
+        .join(Employee, Attendance.employee_id == Employee.employee_id)
+        .order_by(Attendance.date.desc(), Attendance.id.desc())
+        .limit(limit + 1)
+    )
+
+    if cursor:
+        stmt = stmt.where(tuple_(Attendance.date, Attendance.id) < tuple_(*cursor))
+
+    return filter_attendance(stmt, start_date, end_date, department, status)
+
+
+def filter_attendance(
+    stmt,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    status: Optional[str] = None,
+    employee_id: Optional[str] = None
+):
+    """Apply the optional admin list filters to a statement joined to Employee"""
+    if start_date:
+        stmt = stmt.where(Attendance.date >= start_date)
+    if end_date:
+        stmt = stmt.where(Attendance.date <= end_date)
+    if department:
+        stmt = stmt.where(Employee.department == department)
+    if status:
+        stmt = stmt.where(Attendance.status == status)
+    if employee_id:
+        stmt = stmt.where(Attendance.employee_id == employee_id)
+    return stmt
+
+
+def attendance_row(row) -> dict:
+    return {
+        "id": row.id,
+        "employee_id": row.employee_id,
+        "name": row.name,
+        "department": row.department,
+        "date": row.date,
+        "check_in": row.check_in,
+        "check_out": row.check_out,
+        "status": row.status
+    }
+
+
+def attendance_record(row) -> dict:
+    return {
+        "id": row.id,
+        "employee_id": row.employee_id,
+        "date": row.date,
+        "check_in": row.check_in,
+        "check_out": row.check_out,
+        "status": row.status
+    }
+
+
+def today_statement(employee_id: str, today: date):
+    return select(Attendance).where(
+        Attendance.employee_id == employee_id,
+        Attendance.date == today
+    )
+
+
+def today_response(record: Optional[Attendance], today: date) -> dict:
     if not record:
-        record = Attendance(
-            employee_id=current_user.employee_id,
-            date=today,
-            check_in=datetime.utcnow(),
-            status="PRESENT"
-        )
-        db.add(record)
-    else:
-        record.check_in = datetime.utcnow()
+        return {
+            "date": today,
+            "check_in": None,
+            "check_out": None,
+            "status": "ABSENT"
+        }
+
+    return {
+        "date": record.date,
+        "check_in": record.check_in,
+        "check_out": record.check_out,
+        "status": record.status
+    }
+
+
+def page_response(records, limit: int, response: Response) -> list:
+    """Trim the look-ahead row and advertise the next cursor when there is one"""
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.date, last.id)
+
+    return json_response([attendance_row(row) for row in records], response)
+
+
+def employee_attendance_statement(employee_id: str):
+    return (
+        select(*ATTENDANCE_RECORD_COLUMNS)
+        .where(Attendance.employee_id == employee_id)
+        .order_by(Attendance.date.desc())
+    )
+
+
+def publish_attendance(event_type: str, employee_id: str, day: date, at: time) -> None:
+    """Push a committed check-in/check-out to live dashboards"""
+    publisher.publish(event_type, {"employee_id": employee_id, "date": day, "time": at})
 
+
+def already_checked_in_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Already checked in today"
+    )
+
+
+def no_records_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="No attendance records found"
+    )
+
+
+# =========================
+# CHECK-IN
+# =========================
+@router.post("/check-in")
+def check_in(
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    dialect_name = db.get_bind().dialect.name
+    today = date.today()
+    now = datetime.utcnow().time()
+    stmt = check_in_statement(dialect_name, current_user.employee_id, today, now)
+
+    if db.execute(stmt).first() is None:
+        db.rollback()
+        raise already_checked_in_error()
+
+    # Same transaction, so the rollups never drift from the attendance rows
+    for stmt in rollup_statements(dialect_name, current_user.employee_id, today, checked_in=1):
+        db.execute(stmt)
     db.commit()
+    bump_version(db, "attendance")
+    publish_attendance("attendance.check_in", current_user.employee_id, today, now)
     return {"message": "Checked in successfully"}
 
 
@@ -57,32 +279,47 @@ def check_out(
     db: Session = Depends(get_db)
 ):
     today = date.today()
+    now = datetime.utcnow().time()
+    stmt = check_out_statement(current_user.employee_id, today, now)
 
-    record = (
-        db.query(Attendance)
-        .filter(
-            Attendance.employee_id == current_user.employee_id,
-            Attendance.date == today
-        )
-        .first()
-    )
+    if db.execute(stmt).first() is None:
+        db.rollback()
+        # Only the failure path pays for a lookup to pick the right message
+        record = db.execute(today_statement(current_user.employee_id, today)).scalars().first()
+        raise check_out_error(record)
 
-    if not record or not record.check_in:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You must check in first"
-        )
+    for stmt in rollup_statements(db.get_bind().dialect.name, current_user.employee_id, today, present=1):
+        db.execute(stmt)
+    db.commit()
+    bump_version(db, "attendance")
+    publish_attendance("attendance.check_out", current_user.employee_id, today, now)
+    return {"message": "Checked out successfully"}
 
-    if record.check_out:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Already checked out today"
-        )
 
-    record.check_out = datetime.utcnow()
-    db.commit()
+# =========================
+# DEVICE EVENT INGESTION
+# =========================
+@router.post("/events")
+def ingest_events(
+    batch: AttendanceEventBatch,
+    device=Depends(require_device),
+    db: Session = Depends(get_db)
+):
+    """Bulk swipes from badge readers, folded to one first-in/last-out row per employee and day"""
+    spans, duplicates = fold_events(batch.events)
+    employee_ids = list({employee_id for employee_id, _ in spans})
+    known = set(db.execute(known_employees_statement(employee_ids)).scalars()) if employee_ids else set()
 
-    return {"message": "Checked out successfully"}
+    rows = upsert_rows(spans, known)
+    if rows:
+        db.execute(attendance_upsert_statement(db.get_bind().dialect.name), rows)
+        for stmt in rollup_refresh_statements(rows):
+            db.execute(stmt)
+        db.commit()
+        bump_version(db, "attendance")
+        publisher.publish("attendance.ingested", ingested_event(rows))
+
+    return ingest_response(len(batch.events), duplicates, rows, set(employee_ids) - known)
 
 
 # =========================
@@ -94,30 +331,8 @@ def get_today_attendance(
     db: Session = Depends(get_db)
 ):
     today = date.today()
-
-    record = (
-        db.query(Attendance)
-        .filter(
-            Attendance.employee_id == current_user.employee_id,
-            Attendance.date == today
-        )
-        .first()
-    )
-
-    if not record:
-        return {
-            "date": today,
-            "check_in": None,
-            "check_out": None,
-            "status": "ABSENT"
-        }
-
-    return {
-        "date": record.date,
-        "check_in": record.check_in,
-        "check_out": record.check_out,
-        "status": record.status
-    }
+    record = db.execute(today_statement(current_user.employee_id, today)).scalars().first()
+    return today_response(record, today)
 
 
 # =========================
@@ -125,28 +340,107 @@ def get_today_attendance(
 # =========================
 @router.get("/all")
 def get_all_attendance(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
     admin=Depends(require_admin),
-    db: Session = Depends(get_db)
+    not_modified=Depends(collection_etag("attendance")),
+    db: Session = Depends(get_read_db)
 ):
-    records = (
-        db.query(Attendance, Employee)
+    stmt = attendance_page_statement(
+        limit=limit,
+        cursor=decode_cursor(cursor) if cursor else None,
+        start_date=start_date,
+        end_date=end_date,
+        department=department,
+        status=status_filter
+    )
+    return page_response(db.execute(stmt).all(), limit, response)
+
+
+# =========================
+# EXPORT (ADMIN ONLY)
+# =========================
+EXPORT_COLUMNS = ["employee_id", "name", "department", "date", "check_in", "check_out", "status"]
+EXPORT_BATCH_SIZE = 2000
+
+
+def export_statement(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None
+):
+    return filter_attendance(
+        select(
+            Employee.employee_id,
+            Employee.full_name,
+            Employee.department,
+            Attendance.date,
+            Attendance.check_in,
+            Attendance.check_out,
+            Attendance.status
+        )
         .join(Employee, Attendance.employee_id == Employee.employee_id)
-        .order_by(Attendance.date.desc())
-        .all()
+        .order_by(Attendance.date, Attendance.id),
+        start_date=start_date,
+        end_date=end_date,
+        department=department,
+        employee_id=employee_id
     )
 
-    return [
-        {
-            "employee_id": emp.employee_id,
-            "name": emp.full_name,
-            "department": emp.department,
-            "date": att.date,
-            "check_in": att.check_in,
-            "check_out": att.check_out,
-            "status": att.status
-        }
-        for att, emp in records
-    ]
+
+def csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n"
+        for row in rows
+    )
+
+
+def export_response(body, format: str) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type="application/x-ndjson" if format == "ndjson" else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="attendance.{format}"'}
+    )
+
+
+def stream_export(stmt, format: str):
+    """Encode batches from a server-side cursor on a dedicated session"""
+    if format == "csv":
+        yield csv_chunk([EXPORT_COLUMNS])
+    encode = ndjson_chunk if format == "ndjson" else csv_chunk
+
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            yield encode(partition)
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_attendance(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    admin=Depends(require_admin)
+):
+    stmt = export_statement(start_date, end_date, department, employee_id)
+    return export_response(stream_export(stmt, format), format)
 
 
 # =========================
@@ -156,19 +450,11 @@ def get_all_attendance(
 def get_employee_attendance(
     employee_id: str,
     admin=Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    records = (
-        db.query(Attendance)
-        .filter(Attendance.employee_id == employee_id)
-        .order_by(Attendance.date.desc())
-        .all()
-    )
+    records = db.execute(employee_attendance_statement(employee_id)).all()
 
     if not records:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No attendance records found"
-        )
+        raise no_records_error()
 
-    return records
+    return json_response([attendance_record(row) for row in records])
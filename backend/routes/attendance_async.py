@@ -0,0 +1,186 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime
+from typing import Optional
+
+from config import AsyncReadSessionLocal
+from utils import get_current_user_async, require_admin_async, require_device, get_async_db, get_async_read_db
+from etags import bump_version_async, collection_etag_async
+from rollups import rollup_statements
+from routes.attendance import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, EXPORT_BATCH_SIZE, EXPORT_COLUMNS,
+    check_in_statement, check_out_statement, check_out_error,
+    decode_cursor, attendance_page_statement, page_response,
+    today_statement, today_response, employee_attendance_statement, attendance_record,
+    export_statement, export_response, csv_chunk, ndjson_chunk,
+    already_checked_in_error, no_records_error, publish_attendance
+)
+from attendance_ingest import (
+    AttendanceEventBatch, fold_events, known_employees_statement,
+    attendance_upsert_statement, upsert_rows, rollup_refresh_statements, ingest_response, ingested_event
+)
+from live_updates import publisher
+from fast_json import json_response
+
+# Same paths and payloads as routes.attendance, served on AsyncSession
+router = APIRouter(tags=["Attendance"])
+
+
+# =========================
+# CHECK-IN
+# =========================
+@router.post("/check-in")
+async def check_in(
+    current_user=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    dialect_name = db.get_bind().dialect.name
+    today = date.today()
+    now = datetime.utcnow().time()
+    stmt = check_in_statement(dialect_name, current_user.employee_id, today, now)
+
+    if (await db.execute(stmt)).first() is None:
+        await db.rollback()
+        raise already_checked_in_error()
+
+    for stmt in rollup_statements(dialect_name, current_user.employee_id, today, checked_in=1):
+        await db.execute(stmt)
+    await db.commit()
+    await bump_version_async(db, "attendance")
+    publish_attendance("attendance.check_in", current_user.employee_id, today, now)
+    return {"message": "Checked in successfully"}
+
+
+# =========================
+# CHECK-OUT
+# =========================
+@router.post("/check-out")
+async def check_out(
+    current_user=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    today = date.today()
+    now = datetime.utcnow().time()
+    stmt = check_out_statement(current_user.employee_id, today, now)
+
+    if (await db.execute(stmt)).first() is None:
+        await db.rollback()
+        record = (await db.execute(today_statement(current_user.employee_id, today))).scalars().first()
+        raise check_out_error(record)
+
+    for stmt in rollup_statements(db.get_bind().dialect.name, current_user.employee_id, today, present=1):
+        await db.execute(stmt)
+    await db.commit()
+    await bump_version_async(db, "attendance")
+    publish_attendance("attendance.check_out", current_user.employee_id, today, now)
+    return {"message": "Checked out successfully"}
+
+
+# =========================
+# DEVICE EVENT INGESTION
+# =========================
+@router.post("/events")
+async def ingest_events(
+    batch: AttendanceEventBatch,
+    device=Depends(require_device),
+    db: AsyncSession = Depends(get_async_db)
+):
+    spans, duplicates = fold_events(batch.events)
+    employee_ids = list({employee_id for employee_id, _ in spans})
+    known = set((await db.execute(known_employees_statement(employee_ids))).scalars()) if employee_ids else set()
+
+    rows = upsert_rows(spans, known)
+    if rows:
+        await db.execute(attendance_upsert_statement(db.get_bind().dialect.name), rows)
+        for stmt in rollup_refresh_statements(rows):
+            await db.execute(stmt)
+        await db.commit()
+        await bump_version_async(db, "attendance")
+        publisher.publish("attendance.ingested", ingested_event(rows))
+
+    return ingest_response(len(batch.events), duplicates, rows, set(employee_ids) - known)
+
+
+# =========================
+# GET TODAY'S ATTENDANCE (SELF)
+# =========================
+@router.get("/today")
+async def get_today_attendance(
+    current_user=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    today = date.today()
+    record = (await db.execute(today_statement(current_user.employee_id, today))).scalars().first()
+    return today_response(record, today)
+
+
+# =========================
+# GET ALL ATTENDANCE (ADMIN ONLY)
+# =========================
+@router.get("/all")
+async def get_all_attendance(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    admin=Depends(require_admin_async),
+    not_modified=Depends(collection_etag_async("attendance")),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    stmt = attendance_page_statement(
+        limit=limit,
+        cursor=decode_cursor(cursor) if cursor else None,
+        start_date=start_date,
+        end_date=end_date,
+        department=department,
+        status=status_filter
+    )
+    return page_response((await db.execute(stmt)).all(), limit, response)
+
+
+# =========================
+# EXPORT (ADMIN ONLY)
+# =========================
+async def stream_export(stmt, format: str):
+    """Encode batches from a server-side cursor on a dedicated session"""
+    if format == "csv":
+        yield csv_chunk([EXPORT_COLUMNS])
+    encode = ndjson_chunk if format == "ndjson" else csv_chunk
+
+    async with AsyncReadSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for partition in result.partitions(EXPORT_BATCH_SIZE):
+            yield encode(partition)
+
+
+@router.get("/export")
+async def export_attendance(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    admin=Depends(require_admin_async)
+):
+    stmt = export_statement(start_date, end_date, department, employee_id)
+    return export_response(stream_export(stmt, format), format)
+
+
+# =========================
+# GET ATTENDANCE BY EMPLOYEE (ADMIN)
+# =========================
+@router.get("/employee/{employee_id}")
+async def get_employee_attendance(
+    employee_id: str,
+    admin=Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    records = (await db.execute(employee_attendance_statement(employee_id))).all()
+
+    if not records:
+        raise no_records_error()
+
+    return json_response([attendance_record(row) for row in records])
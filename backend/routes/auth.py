@@ -1,18 +1,21 @@
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr
 from datetime import timedelta
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from config import ACCESS_TOKEN_EXPIRE_MINUTES
 from utils import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     get_db
 )
+from etags import bump_version_statement
 from models import User, Employee   # adjust import if models are elsewhere
 
-router = APIRouter(prefix="/api/auth", tags=["Auth"])
+router = APIRouter(tags=["Auth"])
 
 # =========================
 # REQUEST / RESPONSE MODELS
@@ -36,25 +39,31 @@ class RegisterRequest(BaseModel):
 
 
 # =========================
-# LOGIN
+# HELPERS
 # =========================
-@router.post("/login", response_model=LoginResponse)
-def login(
-    request: LoginRequest,
-    db: Session = Depends(get_db)
-):
-    user = (
-        db.query(User)
-        .filter(User.employee_id == request.email)
-        .first()
+
+def invalid_credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid email or password"
+    )
+
+def email_registered_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Email already registered"
+    )
+
+def login_statement(email: str):
+    """Credentials and profile in one round trip"""
+    return (
+        select(User, Employee)
+        .join(Employee, Employee.employee_id == User.employee_id)
+        .where(User.employee_id == email)
     )
 
-    if not user or not verify_password(request.password, user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password"
-        )
 
+def login_response(user: User, employee: Employee) -> dict:
     access_token_expires = timedelta(
         minutes=ACCESS_TOKEN_EXPIRE_MINUTES
     )
@@ -64,12 +73,6 @@ def login(
         expires_delta=access_token_expires
     )
 
-    employee = (
-        db.query(Employee)
-        .filter(Employee.employee_id == user.employee_id)
-        .first()
-    )
-
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -82,26 +85,27 @@ def login(
         }
     }
 
+
 # =========================
-# REGISTER (OPTIONAL – ADMIN CAN USE)
+# LOGIN
 # =========================
-@router.post("/register", status_code=201)
-def register(
-    request: RegisterRequest,
+@router.post("/login", response_model=LoginResponse)
+async def login(
+    request: LoginRequest,
     db: Session = Depends(get_db)
 ):
-    existing_user = (
-        db.query(User)
-        .filter(User.employee_id == request.email)
-        .first()
-    )
+    # async so the bcrypt wait holds no threadpool token; only the query borrows one
+    row = await run_in_threadpool(lambda: db.execute(login_statement(request.email)).first())
 
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+    if not row or not await verify_password_async(request.password, row.User.password_hash):
+        raise invalid_credentials_error()
 
+    return login_response(row.User, row.Employee)
+
+# =========================
+# REGISTER (OPTIONAL – ADMIN CAN USE)
+# =========================
+def create_account(db: Session, request: RegisterRequest, password_hash: str) -> None:
     employee = Employee(
         employee_id=request.email,
         full_name=request.name,
@@ -112,11 +116,28 @@ def register(
 
     user = User(
         employee_id=request.email,
-        password_hash=hash_password(request.password)
+        password_hash=password_hash
     )
 
     db.add(employee)
     db.add(user)
+    db.execute(bump_version_statement(db.get_bind().dialect.name, "users"))
     db.commit()
 
+
+@router.post("/register", status_code=201)
+async def register(
+    request: RegisterRequest,
+    db: Session = Depends(get_db)
+):
+    existing_user = await run_in_threadpool(
+        lambda: db.execute(select(User.id).where(User.employee_id == request.email)).first()
+    )
+
+    if existing_user:
+        raise email_registered_error()
+
+    password_hash = await hash_password_async(request.password)
+    await run_in_threadpool(create_account, db, request, password_hash)
+
     return {"message": "User registered successfully"}
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils import hash_password_async, verify_password_async, get_async_db
+from etags import bump_version_statement
+from models import User, Employee
+from routes.auth import (
+    LoginRequest, LoginResponse, RegisterRequest,
+    invalid_credentials_error, email_registered_error, login_statement, login_response
+)
+
+# Same paths and payloads as routes.auth, served on AsyncSession
+router = APIRouter(tags=["Auth"])
+
+
+# =========================
+# LOGIN
+# =========================
+@router.post("/login", response_model=LoginResponse)
+async def login(
+    request: LoginRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    row = (await db.execute(login_statement(request.email))).first()
+
+    if not row or not await verify_password_async(request.password, row.User.password_hash):
+        raise invalid_credentials_error()
+
+    return login_response(row.User, row.Employee)
+
+# =========================
+# REGISTER (OPTIONAL – ADMIN CAN USE)
+# =========================
+@router.post("/register", status_code=201)
+async def register(
+    request: RegisterRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(select(User.id).where(User.employee_id == request.email))
+
+    if result.first():
+        raise email_registered_error()
+
+    employee = Employee(
+        employee_id=request.email,
+        full_name=request.name,
+        email=request.email,
+        department=request.department,
+        role=request.role
+    )
+
+    user = User(
+        employee_id=request.email,
+        password_hash=await hash_password_async(request.password)
+    )
+
+    db.add(employee)
+    db.add(user)
+    await db.execute(bump_version_statement(db.get_bind().dialect.name, "users"))
+    await db.commit()
+
+    return {"message": "User registered successfully"}
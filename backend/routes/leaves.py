@@ -1,11 +1,13 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Request, Response
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
-from config import LEAVES_FILE, USERS_FILE
-from utils import (
-    read_json_file, write_json_file, get_next_id, verify_token
-)
+import os
+from config import USERS_FILE
+from utils import read_json_file, verify_token
+from leave_store import leave_store
+from live_updates import publisher
+from etags import check_etag, etag_value
 
 router = APIRouter()
 
@@ -32,39 +34,39 @@ def get_current_user(authorization: str = Header(None)):
         raise HTTPException(status_code=401, detail="Invalid token")
     return payload
 
+# Plain def: leave_store waits on flock and fsyncs, so these run in the threadpool, off the event loop
 @router.post("/request")
-async def request_leave(request: LeaveRequest, current_user: dict = Depends(get_current_user)):
-    leaves = read_json_file(LEAVES_FILE)
-    
-    new_leave = {
-        "id": get_next_id(leaves),
+def request_leave(request: LeaveRequest, current_user: dict = Depends(get_current_user)):
+    new_leave = leave_store.create({
         "user_id": request.user_id,
         "start_date": request.start_date,
         "end_date": request.end_date,
         "reason": request.reason,
         "status": "pending",
         "created_at": datetime.now().isoformat()
-    }
-    
-    leaves.append(new_leave)
-    write_json_file(LEAVES_FILE, leaves)
+    })
+    publisher.publish("leave.requested", new_leave)
     
     return {"message": "Leave request submitted successfully", "id": new_leave['id']}
 
 @router.get("/user/{user_id}")
-async def get_user_leaves(user_id: int, current_user: dict = Depends(get_current_user)):
-    leaves = read_json_file(LEAVES_FILE)
-    user_leaves = [l for l in leaves if l['user_id'] == user_id]
-    return user_leaves
+def get_user_leaves(user_id: int, current_user: dict = Depends(get_current_user)):
+    return leave_store.for_user(user_id)
 
-@router.get("/pending")
-async def get_pending_leaves(current_user: dict = Depends(get_current_user)):
-    leaves = read_json_file(LEAVES_FILE)
+def pending_leaves_etag(request: Request, response: Response):
+    """The pending list changes with the leave store and with user names in USERS_FILE"""
+    try:
+        users_version = os.stat(USERS_FILE).st_mtime_ns
+    except FileNotFoundError:
+        users_version = 0
+    check_etag(request, response, etag_value("leaves", f"{leave_store.version()}.{users_version}", request))
+
+def pending_leaves_with_names():
     users = read_json_file(USERS_FILE)
     
     user_map = {u['id']: u['name'] for u in users}
     
-    pending_leaves = [l for l in leaves if l['status'] == 'pending']
+    pending_leaves = leave_store.with_status('pending')
     
     result = []
     for leave in pending_leaves:
@@ -75,30 +77,30 @@ async def get_pending_leaves(current_user: dict = Depends(get_current_user)):
     
     return result
 
+@router.get("/pending")
+def get_pending_leaves(current_user: dict = Depends(get_current_user), not_modified=Depends(pending_leaves_etag)):
+    return pending_leaves_with_names()
+
 @router.post("/approve/{leave_id}")
-async def approve_leave(leave_id: int, current_user: dict = Depends(get_current_user)):
-    leaves = read_json_file(LEAVES_FILE)
-    
-    leave = next((l for l in leaves if l['id'] == leave_id), None)
+def approve_leave(leave_id: int, current_user: dict = Depends(get_current_user)):
+    leave = leave_store.update(leave_id, {
+        "status": "approved",
+        "approved_at": datetime.now().isoformat()
+    })
     if not leave:
         raise HTTPException(status_code=404, detail="Leave request not found")
+    publisher.publish("leave.status", leave)
     
-    leave['status'] = 'approved'
-    leave['approved_at'] = datetime.now().isoformat()
-    
-    write_json_file(LEAVES_FILE, leaves)
     return {"message": "Leave approved successfully"}
 
 @router.post("/reject/{leave_id}")
-async def reject_leave(leave_id: int, current_user: dict = Depends(get_current_user)):
-    leaves = read_json_file(LEAVES_FILE)
-    
-    leave = next((l for l in leaves if l['id'] == leave_id), None)
+def reject_leave(leave_id: int, current_user: dict = Depends(get_current_user)):
+    leave = leave_store.update(leave_id, {
+        "status": "rejected",
+        "rejected_at": datetime.now().isoformat()
+    })
     if not leave:
         raise HTTPException(status_code=404, detail="Leave request not found")
+    publisher.publish("leave.status", leave)
     
-    leave['status'] = 'rejected'
-    leave['rejected_at'] = datetime.now().isoformat()
-    
-    write_json_file(LEAVES_FILE, leaves)
     return {"message": "Leave rejected successfully"}
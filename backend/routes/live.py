@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from config import SessionLocal, LIVE_UPDATES_HEARTBEAT_SECONDS
+from utils import token_subject, principal_cache, load_principal, principal_not_found, check_admin
+from live_updates import publisher, sse_message
+
+router = APIRouter()
+
+
+def stream_admin(token: str = Query(...)):
+    """
+    Admin check for EventSource clients, which cannot send headers. Uses a
+    short-lived session so an open stream does not hold a pooled connection.
+    """
+    employee_id = token_subject(token)
+    user = principal_cache.get(employee_id)
+
+    if user is None:
+        with SessionLocal() as db:
+            user = load_principal(db, employee_id)
+        if not user:
+            raise principal_not_found()
+        principal_cache.put(employee_id, user)
+
+    return check_admin(user)
+
+
+async def event_stream(request: Request):
+    subscription = publisher.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            event = await subscription.next(timeout=LIVE_UPDATES_HEARTBEAT_SECONDS)
+            # A comment line keeps proxies from closing an idle stream
+            yield sse_message(event) if event else ": keep-alive\n\n"
+    finally:
+        publisher.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def stream_updates(request: Request, admin=Depends(stream_admin)):
+    """Server-Sent Events: attendance.* and leave.* changes as they commit"""
+    return StreamingResponse(
+        event_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile, status
 from pydantic import BaseModel, EmailStr
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from typing import Optional
 
-from utils import get_current_user, require_admin, get_db, hash_password
+from utils import get_current_user, require_admin, get_db, get_read_db, hash_password, hash_passwords, principal_cache
+from etags import bump_version_statement, collection_etag
+from fast_json import json_response
 from models import User, Employee
 
-router = APIRouter(prefix="/api/users", tags=["Users"])
+router = APIRouter(tags=["Users"])
 
 # =========================
 # SCHEMAS
@@ -25,30 +30,68 @@ class UserUpdate(BaseModel):
     department: str
 
 
+# =========================
+# HELPERS
+# =========================
+
+def employee_response(employee: Employee) -> dict:
+    return {
+        "employee_id": employee.employee_id,
+        "name": employee.full_name,
+        "email": employee.email,
+        "role": employee.role,
+        "department": employee.department
+    }
+
+def employee_list_statement():
+    """Just the columns employee_response reads; the rows stand in for Employee objects"""
+    return (
+        select(
+            Employee.employee_id,
+            Employee.full_name,
+            Employee.email,
+            Employee.role,
+            Employee.department
+        )
+        .order_by(Employee.full_name)
+    )
+
+def rename_login_statement(old_employee_id: str, new_employee_id: str):
+    return update(User).where(User.employee_id == old_employee_id).values(employee_id=new_employee_id)
+
+def delete_employee_statements(employee_id: str) -> list:
+    """Login first, then the employee; the employee delete's rowcount tells whether it existed"""
+    return [
+        delete(User).where(User.employee_id == employee_id),
+        delete(Employee).where(Employee.employee_id == employee_id)
+    ]
+
+def user_not_found_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="User not found"
+    )
+
+def email_exists_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Email already exists"
+    )
+
+
 # =========================
 # GET ALL USERS (ADMIN)
 # =========================
 @router.get("")
 def get_all_users(
+    response: Response,
     admin=Depends(require_admin),
-    db: Session = Depends(get_db)
+    not_modified=Depends(collection_etag("users")),
+    db: Session = Depends(get_read_db)
 ):
-    users = (
-        db.query(Employee)
-        .order_by(Employee.full_name)
-        .all()
-    )
+    users = db.execute(employee_list_statement()).all()
 
-    return [
-        {
-            "employee_id": u.employee_id,
-            "name": u.full_name,
-            "email": u.email,
-            "role": u.role,
-            "department": u.department
-        }
-        for u in users
-    ]
+    return json_response([employee_response(u) for u in users], response)
 
 
 # =========================
@@ -58,7 +101,7 @@ def get_all_users(
 def get_user(
     employee_id: str,
     admin=Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     user = (
         db.query(Employee)
@@ -67,18 +110,9 @@ def get_user(
     )
 
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+        raise user_not_found_error()
 
-    return {
-        "employee_id": user.employee_id,
-        "name": user.full_name,
-        "email": user.email,
-        "role": user.role,
-        "department": user.department
-    }
+    return employee_response(user)
 
 
 # =========================
@@ -91,10 +125,7 @@ def create_user(
     db: Session = Depends(get_db)
 ):
     if db.query(User).filter(User.employee_id == user_data.email).first():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already exists"
-        )
+        raise email_exists_error()
 
     employee = Employee(
         employee_id=user_data.email,
@@ -111,15 +142,50 @@ def create_user(
 
     db.add(employee)
     db.add(user)
+    db.execute(bump_version_statement(db.get_bind().dialect.name, "users"))
     db.commit()
 
-    return {
-        "employee_id": employee.employee_id,
-        "name": employee.full_name,
-        "email": employee.email,
-        "role": employee.role,
-        "department": employee.department
-    }
+    return employee_response(employee)
+
+
+# =========================
+# BULK IMPORT (ADMIN)
+# =========================
+@router.post("/import")
+def import_users(
+    file: UploadFile = File(...),
+    default_password: Optional[str] = Form(None),
+    admin=Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Create employees from a CSV/XLSX upload (name, email[, password, role, department])"""
+    # Imported here so workers only load pandas once an import is uploaded
+    from user_import import (
+        read_upload, existing_accounts_statements, validate, import_batches,
+        import_report, import_conflict_error, EMPLOYEE_INSERT, USER_INSERT
+    )
+
+    frame = read_upload(file.file.read(), file.filename or "")
+
+    emails = frame["email"][frame["email"] != ""].unique().tolist()
+    existing = set()
+    for stmt in existing_accounts_statements(emails):
+        existing.update(db.execute(stmt).scalars())
+    valid, errors = validate(frame, existing, default_password)
+
+    password_hashes = hash_passwords(valid["password"].tolist())
+
+    try:
+        for employees, users in import_batches(valid, password_hashes):
+            db.execute(EMPLOYEE_INSERT, employees)
+            db.execute(USER_INSERT, users)
+        db.execute(bump_version_statement(db.get_bind().dialect.name, "users"))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise import_conflict_error()
+
+    return import_report(len(frame), len(valid), errors)
 
 
 # =========================
@@ -139,10 +205,7 @@ def update_user(
     )
 
     if not employee:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+        raise user_not_found_error()
 
     # Prevent email collision
     if (
@@ -151,10 +214,7 @@ def update_user(
         .filter(Employee.email == user_data.email)
         .first()
     ):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already exists"
-        )
+        raise email_exists_error()
 
     employee.full_name = user_data.name
     employee.email = user_data.email
@@ -163,24 +223,18 @@ def update_user(
 
     # Sync employee_id if email changed
     if employee.employee_id != user_data.email:
-        user = (
-            db.query(User)
-            .filter(User.employee_id == employee.employee_id)
-            .first()
-        )
-        if user:
-            user.employee_id = user_data.email
+        db.execute(rename_login_statement(employee.employee_id, user_data.email))
         employee.employee_id = user_data.email
 
+    # /api/attendance/all embeds each employee's name and department
+    for collection in ("users", "attendance"):
+        db.execute(bump_version_statement(db.get_bind().dialect.name, collection))
+    # Built before the commit expires `employee`, which would cost a reload
+    updated = employee_response(employee)
     db.commit()
+    principal_cache.invalidate(employee_id, user_data.email)
 
-    return {
-        "employee_id": employee.employee_id,
-        "name": employee.full_name,
-        "email": employee.email,
-        "role": employee.role,
-        "department": employee.department
-    }
+    return updated
 
 
 # =========================
@@ -199,28 +253,16 @@ def delete_user(
             detail="You cannot delete yourself"
         )
 
-    employee = (
-        db.query(Employee)
-        .filter(Employee.employee_id == employee_id)
-        .first()
-    )
-
-    if not employee:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-
-    user = (
-        db.query(User)
-        .filter(User.employee_id == employee_id)
-        .first()
-    )
-
-    if user:
-        db.delete(user)
+    delete_login, delete_employee = delete_employee_statements(employee_id)
+    db.execute(delete_login)
+    if db.execute(delete_employee).rowcount == 0:
+        db.rollback()
+        raise user_not_found_error()
 
-    db.delete(employee)
+    # The employee's rows drop out of /api/attendance/all's join
+    for collection in ("users", "attendance"):
+        db.execute(bump_version_statement(db.get_bind().dialect.name, collection))
     db.commit()
+    principal_cache.invalidate(employee_id)
 
     return {"message": "User deleted successfully"}
@@ -0,0 +1,204 @@
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from utils import require_admin_async, get_async_db, get_async_read_db, hash_password_async, hash_passwords, principal_cache
+from etags import bump_version_statement, collection_etag_async
+from fast_json import json_response
+from models import User, Employee
+from routes.users import (
+    UserCreate, UserUpdate,
+    employee_response, employee_list_statement, rename_login_statement, delete_employee_statements,
+    user_not_found_error, email_exists_error
+)
+
+# Same paths and payloads as routes.users, served on AsyncSession
+router = APIRouter(tags=["Users"])
+
+
+async def find_employee(db: AsyncSession, employee_id: str):
+    result = await db.execute(select(Employee).where(Employee.employee_id == employee_id))
+    return result.scalars().first()
+
+
+async def find_user(db: AsyncSession, employee_id: str):
+    result = await db.execute(select(User).where(User.employee_id == employee_id))
+    return result.scalars().first()
+
+
+# =========================
+# GET ALL USERS (ADMIN)
+# =========================
+@router.get("")
+async def get_all_users(
+    response: Response,
+    admin=Depends(require_admin_async),
+    not_modified=Depends(collection_etag_async("users")),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    result = await db.execute(employee_list_statement())
+    return json_response([employee_response(u) for u in result], response)
+
+
+# =========================
+# GET SINGLE USER (ADMIN)
+# =========================
+@router.get("/{employee_id}")
+async def get_user(
+    employee_id: str,
+    admin=Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    user = await find_employee(db, employee_id)
+
+    if not user:
+        raise user_not_found_error()
+
+    return employee_response(user)
+
+
+# =========================
+# CREATE USER (ADMIN)
+# =========================
+@router.post("", status_code=201)
+async def create_user(
+    user_data: UserCreate,
+    admin=Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if await find_user(db, user_data.email):
+        raise email_exists_error()
+
+    employee = Employee(
+        employee_id=user_data.email,
+        full_name=user_data.name,
+        email=user_data.email,
+        department=user_data.department,
+        role=user_data.role
+    )
+
+    user = User(
+        employee_id=user_data.email,
+        password_hash=await hash_password_async(user_data.password)
+    )
+
+    db.add(employee)
+    db.add(user)
+    await db.execute(bump_version_statement(db.get_bind().dialect.name, "users"))
+    await db.commit()
+
+    return employee_response(employee)
+
+
+# =========================
+# BULK IMPORT (ADMIN)
+# =========================
+@router.post("/import")
+async def import_users(
+    file: UploadFile = File(...),
+    default_password: Optional[str] = Form(None),
+    admin=Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Imported here so workers only load pandas once an import is uploaded
+    from user_import import (
+        read_upload, existing_accounts_statements, validate, import_batches,
+        import_report, import_conflict_error, EMPLOYEE_INSERT, USER_INSERT
+    )
+
+    # Parsing and hashing are CPU-bound: keep them off the event loop
+    frame = await run_in_threadpool(read_upload, await file.read(), file.filename or "")
+
+    emails = frame["email"][frame["email"] != ""].unique().tolist()
+    existing = set()
+    for stmt in existing_accounts_statements(emails):
+        existing.update((await db.execute(stmt)).scalars())
+    valid, errors = validate(frame, existing, default_password)
+
+    password_hashes = await run_in_threadpool(hash_passwords, valid["password"].tolist())
+
+    try:
+        for employees, users in import_batches(valid, password_hashes):
+            await db.execute(EMPLOYEE_INSERT, employees)
+            await db.execute(USER_INSERT, users)
+        await db.execute(bump_version_statement(db.get_bind().dialect.name, "users"))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise import_conflict_error()
+
+    return import_report(len(frame), len(valid), errors)
+
+
+# =========================
+# UPDATE USER (ADMIN)
+# =========================
+@router.put("/{employee_id}")
+async def update_user(
+    employee_id: str,
+    user_data: UserUpdate,
+    admin=Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    employee = await find_employee(db, employee_id)
+
+    if not employee:
+        raise user_not_found_error()
+
+    # Prevent email collision
+    if employee.email != user_data.email:
+        result = await db.execute(select(Employee.id).where(Employee.email == user_data.email))
+        if result.first():
+            raise email_exists_error()
+
+    employee.full_name = user_data.name
+    employee.email = user_data.email
+    employee.department = user_data.department
+    employee.role = user_data.role
+
+    # Sync employee_id if email changed
+    if employee.employee_id != user_data.email:
+        await db.execute(rename_login_statement(employee.employee_id, user_data.email))
+        employee.employee_id = user_data.email
+
+    # /api/attendance/all embeds each employee's name and department
+    for collection in ("users", "attendance"):
+        await db.execute(bump_version_statement(db.get_bind().dialect.name, collection))
+    await db.commit()
+    principal_cache.invalidate(employee_id, user_data.email)
+
+    return employee_response(employee)
+
+
+# =========================
+# DELETE USER (ADMIN)
+# =========================
+@router.delete("/{employee_id}")
+async def delete_user(
+    employee_id: str,
+    admin=Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Prevent admin from deleting themselves
+    if admin.employee_id == employee_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You cannot delete yourself"
+        )
+
+    delete_login, delete_employee = delete_employee_statements(employee_id)
+    await db.execute(delete_login)
+    if (await db.execute(delete_employee)).rowcount == 0:
+        await db.rollback()
+        raise user_not_found_error()
+
+    # The employee's rows drop out of /api/attendance/all's join
+    for collection in ("users", "attendance"):
+        await db.execute(bump_version_statement(db.get_bind().dialect.name, collection))
+    await db.commit()
+    principal_cache.invalidate(employee_id)
+
+    return {"message": "User deleted successfully"}
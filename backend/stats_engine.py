@@ -0,0 +1,233 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# =========================
+# DATE PARSING
+# =========================
+def parse_record_date(value: Any) -> Optional[date]:
+    """Parse a legacy JSON date field, returning None when it is missing or invalid"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).date()
+    except ValueError:
+        return None
+
+
+# =========================
+# ATTENDANCE INDEX
+# =========================
+class AttendanceIndex:
+    """By-date, by-month and by-user views of the attendance list, built in one pass"""
+
+    def __init__(self, attendance: List[Dict[str, Any]]):
+        self.by_date: Dict[date, List[Dict[str, Any]]] = defaultdict(list)
+        self.by_month: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+        self.by_user: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+        self.dates_by_user: Dict[Any, set] = defaultdict(set)
+        # First record per (user, date), matching the old `user_attendance[0]` lookup
+        self.first_by_user_date: Dict[Tuple[Any, date], Dict[str, Any]] = {}
+
+        for record in attendance:
+            record_date = parse_record_date(record.get('date'))
+            if record_date is None:
+                continue
+
+            user_id = record.get('user_id')
+            self.by_date[record_date].append(record)
+            self.by_month[(record_date.year, record_date.month)].append(record)
+            self.by_user[user_id].append(record)
+            self.dates_by_user[user_id].add(record_date)
+            self.first_by_user_date.setdefault((user_id, record_date), record)
+
+    def day(self, day: date) -> List[Dict[str, Any]]:
+        return self.by_date.get(day, [])
+
+    def month(self, year: int, month: int) -> List[Dict[str, Any]]:
+        return self.by_month.get((year, month), [])
+
+    def for_user(self, user_id: Any) -> List[Dict[str, Any]]:
+        return self.by_user.get(user_id, [])
+
+    def first_for(self, user_id: Any, day: date) -> Optional[Dict[str, Any]]:
+        return self.first_by_user_date.get((user_id, day))
+
+
+# =========================
+# COUNTERS
+# =========================
+def count_day(records: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Return (present, checked_in) for a list of attendance records"""
+    present = 0
+    checked_in = 0
+    for record in records:
+        if record.get('check_in'):
+            checked_in += 1
+            if record.get('check_out'):
+                present += 1
+    return present, checked_in
+
+
+def compute_dashboard_stats(
+    users: List[Dict[str, Any]],
+    attendance: Optional[List[Dict[str, Any]]],
+    leaves: List[Dict[str, Any]],
+    today: Optional[date] = None,
+    index: Optional[AttendanceIndex] = None
+) -> Dict[str, Any]:
+    """Compute the /api/dashboard/stats payload in O(users + attendance + leaves); pass either attendance or a prebuilt index"""
+    today = today or datetime.now().date()
+    index = index or AttendanceIndex(attendance or [])
+
+    total_employees = 0
+    total_admins = 0
+    for user in users:
+        role = user.get('role')
+        if role == 'employee':
+            total_employees += 1
+        elif role == 'admin':
+            total_admins += 1
+
+    today_attendance = index.day(today)
+    present_today, checked_in_today = count_day(today_attendance)
+
+    leave_counts = {'pending': 0, 'approved': 0, 'rejected': 0}
+    for leave in leaves:
+        leave_status = leave.get('status')
+        if leave_status in leave_counts:
+            leave_counts[leave_status] += 1
+
+    this_month_attendance = index.month(today.year, today.month)
+
+    departments = {}
+    for user in users:
+        dept = user.get('department', 'Unknown')
+        if dept not in departments:
+            departments[dept] = {'total': 0, 'present': 0}
+        departments[dept]['total'] += 1
+
+        record = index.first_for(user.get('id'), today)
+        if record and record.get('check_in'):
+            departments[dept]['present'] += 1
+
+    return {
+        "total_users": len(users),
+        "total_employees": total_employees,
+        "total_admins": total_admins,
+        "today": {
+            "present": present_today,
+            "absent": total_employees - checked_in_today,
+            "total_checked_in": checked_in_today
+        },
+        "leaves": {
+            "pending": leave_counts['pending'],
+            "approved": leave_counts['approved'],
+            "rejected": leave_counts['rejected'],
+            "total": len(leaves)
+        },
+        "this_month": {
+            "total_records": len(this_month_attendance),
+            "unique_employees": len(set(a.get('user_id') for a in this_month_attendance))
+        },
+        "departments": departments
+    }
+
+
+def compute_attendance_chart(
+    users: List[Dict[str, Any]],
+    index: AttendanceIndex,
+    days: int = 7,
+    today: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """Compute the /api/dashboard/attendance-chart payload, one index lookup per day"""
+    today = today or datetime.now().date()
+
+    chart_data = []
+    for i in range(days - 1, -1, -1):
+        day = today - timedelta(days=i)
+        present, checked_in = count_day(index.day(day))
+        chart_data.append({
+            "date": str(day),
+            "present": present,
+            "absent": len(users) - checked_in,
+            "checked_in": checked_in
+        })
+    return chart_data
+
+
+def compute_employee_performance(
+    users: List[Dict[str, Any]],
+    leaves: List[Dict[str, Any]],
+    index: AttendanceIndex
+) -> List[Dict[str, Any]]:
+    """Compute the /api/dashboard/employee-performance payload in O(users + attendance + leaves)"""
+    leave_counts: Dict[Any, Dict[str, int]] = defaultdict(lambda: {'approved': 0, 'pending': 0})
+    for leave in leaves:
+        leave_status = leave.get('status')
+        if leave_status in ('approved', 'pending'):
+            leave_counts[leave.get('user_id')][leave_status] += 1
+
+    performance_data = []
+    for user in users:
+        if user.get('role') != 'employee':
+            continue
+
+        user_id = user.get('id')
+        user_attendance = index.for_user(user_id)
+        total_days = len(index.dates_by_user.get(user_id, ()))
+        present_days, _ = count_day(user_attendance)
+        attendance_rate = (present_days / total_days * 100) if total_days > 0 else 0
+        counts = leave_counts.get(user_id, {'approved': 0, 'pending': 0})
+
+        performance_data.append({
+            "user_id": user_id,
+            "name": user.get('name'),
+            "email": user.get('email'),
+            "department": user.get('department'),
+            "total_attendance_records": len(user_attendance),
+            "present_days": present_days,
+            "attendance_rate": round(attendance_rate, 2),
+            "approved_leaves": counts['approved'],
+            "pending_leaves": counts['pending']
+        })
+
+    return sorted(performance_data, key=lambda x: x['attendance_rate'], reverse=True)
+
+
+def compute_monthly_report(
+    users: List[Dict[str, Any]],
+    index: AttendanceIndex,
+    month: int,
+    year: int,
+    working_days: int = 20
+) -> Dict[str, Any]:
+    """Compute the /api/dashboard/monthly-report payload from the month bucket of the index"""
+    monthly_data = index.month(year, month)
+
+    by_user: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    for record in monthly_data:
+        by_user[record.get('user_id')].append(record)
+
+    total_present, total_checked_in = count_day(monthly_data)
+    report = {
+        "month": month,
+        "year": year,
+        "total_records": len(monthly_data),
+        "unique_employees": len(by_user),
+        "total_present": total_present,
+        "total_absent": len(users) * working_days - total_checked_in,
+        "employee_summary": []
+    }
+
+    for user in users:
+        if user.get('role') == 'employee':
+            present, checked_in = count_day(by_user.get(user.get('id'), []))
+            report["employee_summary"].append({
+                "name": user.get('name'),
+                "email": user.get('email'),
+                "present": present,
+                "absent": working_days - checked_in
+            })
+
+    return report
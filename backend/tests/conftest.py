@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+# config reads these at import: point every test run at a scratch database and data directory
+_scratch = tempfile.mkdtemp(prefix="smart-attendance-tests-")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", f"sqlite:///{_scratch}/test.db")
+os.environ["DATA_DIR"] = os.path.join(_scratch, "data")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The app with its lifespan run, so the schema and demo accounts exist"""
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def login(client, email: str, password: str = "password") -> dict:
+    response = client.post("/api/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    return login(client, "admin@example.com")
+
+
+@pytest.fixture
+def employee(client, admin_headers):
+    """A fresh employee account (email, auth headers), deleted afterwards if the test did not"""
+    email = f"test-{uuid.uuid4().hex[:8]}@example.com"
+    response = client.post("/api/users", headers=admin_headers, json={
+        "name": "Test Employee", "email": email, "password": "password", "department": "QA"
+    })
+    assert response.status_code == 201, response.text
+    yield email, login(client, email)
+    client.delete(f"/api/users/{email}", headers=admin_headers)
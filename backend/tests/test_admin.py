@@ -0,0 +1,6 @@
+def test_bootstrap_users_match_the_user_list(client, admin_headers):
+    bootstrap = client.get("/api/admin/bootstrap", headers=admin_headers, params={"sections": "users"})
+    users = client.get("/api/users", headers=admin_headers)
+
+    assert bootstrap.status_code == users.status_code == 200
+    assert bootstrap.json()["users"] == users.json()
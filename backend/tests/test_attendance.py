@@ -0,0 +1,33 @@
+import uuid
+from datetime import date, timedelta
+
+from config import SessionLocal
+from models import Attendance
+
+
+def test_consecutive_pages_are_disjoint(client, admin_headers):
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Attendance(employee_id="jane@example.com", date=date(2021, 3, 1) + timedelta(days=i), status="PRESENT")
+            for i in range(5)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    first = client.get("/api/attendance/all", headers=admin_headers, params={"limit": 2})
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/api/attendance/all", headers=admin_headers, params={"limit": 2, "cursor": cursor})
+
+    first_ids = {row["id"] for row in first.json()}
+    second_ids = {row["id"] for row in second.json()}
+    assert len(first_ids) == len(second_ids) == 2
+    assert first_ids.isdisjoint(second_ids)
+    assert all(uuid.UUID(i) for i in first_ids | second_ids)
+
+
+def test_bootstrap_attendance_items_carry_ids(client, admin_headers):
+    response = client.get("/api/admin/bootstrap", headers=admin_headers, params={"sections": "attendance"})
+    items = response.json()["attendance"]["items"]
+    assert items and all(item["id"] for item in items)
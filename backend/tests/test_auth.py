@@ -0,0 +1,32 @@
+import asyncio
+import uuid
+
+from routes import auth
+
+
+def test_password_handlers_do_not_hold_threadpool_tokens():
+    # Sync handlers would keep an anyio threadpool token for the whole bcrypt wait
+    assert asyncio.iscoroutinefunction(auth.login)
+    assert asyncio.iscoroutinefunction(auth.register)
+
+
+def test_login(client):
+    response = client.post("/api/auth/login", json={"email": "emp@example.com", "password": "password"})
+    assert response.status_code == 200
+    assert response.json()["user"]["employee_id"] == "emp@example.com"
+
+    wrong = client.post("/api/auth/login", json={"email": "emp@example.com", "password": "nope"})
+    unknown = client.post("/api/auth/login", json={"email": "nobody@example.com", "password": "password"})
+    assert wrong.status_code == unknown.status_code == 401
+
+
+def test_register_then_login(client):
+    email = f"reg-{uuid.uuid4().hex[:8]}@example.com"
+    payload = {"name": "New Hire", "email": email, "password": "s3cret-pass"}
+
+    assert client.post("/api/auth/register", json=payload).status_code == 201
+    assert client.post("/api/auth/register", json=payload).status_code == 400
+
+    response = client.post("/api/auth/login", json={"email": email, "password": "s3cret-pass"})
+    assert response.status_code == 200
+    assert response.json()["user"]["name"] == "New Hire"
@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture
+def admin_token(admin_headers):
+    return admin_headers["Authorization"].split(" ", 1)[1]
+
+
+@pytest.mark.parametrize("params", [{"month": 13}, {"month": 0}, {"year": 0}])
+def test_monthly_report_rejects_out_of_range_periods(client, admin_token, params):
+    response = client.get("/api/dashboard/monthly-report", params={"token": admin_token, **params})
+    assert response.status_code == 422
+
+
+def test_monthly_report(client, admin_token):
+    response = client.get("/api/dashboard/monthly-report", params={"token": admin_token, "month": 1, "year": 2024})
+    assert response.status_code == 200
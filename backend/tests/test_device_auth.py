@@ -0,0 +1,30 @@
+import pytest
+from fastapi import HTTPException
+
+import utils
+
+
+@pytest.fixture
+def device_keys(monkeypatch):
+    monkeypatch.setattr(utils, "DEVICE_API_KEYS", ["reader-1", "lecteur-é"])
+
+
+def test_configured_keys_are_accepted(device_keys):
+    assert utils.require_device("reader-1") == "reader-1"
+    assert utils.require_device("lecteur-é") == "lecteur-é"
+
+
+@pytest.mark.parametrize("presented", [None, "", "reader-2", "clé-inconnue", "réader-1"])
+def test_other_keys_get_401(device_keys, presented):
+    with pytest.raises(HTTPException) as raised:
+        utils.require_device(presented)
+    assert raised.value.status_code == 401
+
+
+def test_non_ascii_header_is_a_401_not_a_500(client, device_keys):
+    response = client.post(
+        "/api/attendance/events",
+        headers={"X-Device-Key": "clé".encode("latin-1")},
+        json={"events": []}
+    )
+    assert response.status_code == 401
@@ -0,0 +1,73 @@
+from sqlalchemy import event
+
+import config
+
+
+def test_attendance_etag_changes_when_an_employee_is_renamed(client, admin_headers, employee):
+    email, headers = employee
+    assert client.post("/api/attendance/check-in", headers=headers).status_code == 200
+
+    first = client.get("/api/attendance/all", headers=admin_headers)
+    etag = first.headers["ETag"]
+    assert client.get("/api/attendance/all", headers={**admin_headers, "If-None-Match": etag}).status_code == 304
+
+    response = client.put(f"/api/users/{email}", headers=admin_headers, json={
+        "name": "Renamed Employee", "email": email, "role": "EMPLOYEE", "department": "Finance"
+    })
+    assert response.status_code == 200
+
+    second = client.get("/api/attendance/all", headers={**admin_headers, "If-None-Match": etag})
+    assert second.status_code == 200
+    row = next(r for r in second.json() if r["employee_id"] == email)
+    assert (row["name"], row["department"]) == ("Renamed Employee", "Finance")
+
+
+def test_attendance_etag_changes_when_an_employee_is_deleted(client, admin_headers, employee):
+    email, headers = employee
+    assert client.post("/api/attendance/check-in", headers=headers).status_code == 200
+    etag = client.get("/api/attendance/all", headers=admin_headers).headers["ETag"]
+
+    assert client.delete(f"/api/users/{email}", headers=admin_headers).status_code == 200
+
+    response = client.get("/api/attendance/all", headers={**admin_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert all(r["employee_id"] != email for r in response.json())
+
+
+def test_check_in_and_check_out_change_the_attendance_etag(client, admin_headers, employee):
+    _, headers = employee
+    tags = [client.get("/api/attendance/all", headers=admin_headers).headers["ETag"]]
+
+    for action in ("check-in", "check-out"):
+        assert client.post(f"/api/attendance/{action}", headers=headers).status_code == 200
+        response = client.get("/api/attendance/all", headers={**admin_headers, "If-None-Match": tags[-1]})
+        assert response.status_code == 200
+        tags.append(response.headers["ETag"])
+
+    assert len(set(tags)) == 3
+
+
+def test_check_in_bumps_the_version_after_its_commit(client, employee):
+    _, headers = employee
+    events = []
+    # ASYNC_DB check-ins run on the async engine
+    engine = config.async_engine.sync_engine if config.ASYNC_DB else config.engine
+
+    def statement(conn, cursor, sql, parameters, context, executemany):
+        events.append("bump" if "collection_versions" in sql else "statement")
+
+    def commit(conn):
+        events.append("commit")
+
+    event.listen(engine, "before_cursor_execute", statement)
+    event.listen(engine, "commit", commit)
+    try:
+        assert client.post("/api/attendance/check-in", headers=headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", statement)
+        event.remove(engine, "commit", commit)
+
+    # The upsert and rollups commit without touching the shared version row
+    first_commit = events.index("commit")
+    assert "bump" not in events[:first_commit]
+    assert events[first_commit + 1:] == ["bump", "commit"]
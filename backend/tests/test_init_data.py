@@ -0,0 +1,59 @@
+from datetime import date, time
+
+import pytest
+from sqlalchemy import inspect, text
+
+import init_data
+from config import SessionLocal, engine
+from models import Attendance
+
+
+def attendance_indexes():
+    return {index["name"] for index in inspect(engine).get_indexes("attendance")}
+
+
+def test_duplicate_days_are_merged_before_the_unique_index_is_created(client):
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX uq_attendance_employee_date"))
+    db = SessionLocal()
+    try:
+        day = date(2020, 1, 6)
+        db.add_all([
+            Attendance(employee_id="dup@example.com", date=day, check_in=time(9, 30), check_out=None, status="PRESENT"),
+            Attendance(employee_id="dup@example.com", date=day, check_in=time(8, 55), check_out=time(17, 0), status="PRESENT"),
+            Attendance(employee_id="dup@example.com", date=day, check_in=None, check_out=time(18, 15), status="PRESENT"),
+        ])
+        db.commit()
+
+        init_data.initialize_data()
+
+        assert "uq_attendance_employee_date" in attendance_indexes()
+        rows = db.query(Attendance).filter(Attendance.employee_id == "dup@example.com").all()
+        assert [(r.check_in, r.check_out) for r in rows] == [(time(8, 55), time(18, 15))]
+        assert init_data.is_initialized()
+    finally:
+        db.close()
+
+
+def test_schema_marker_is_not_written_when_an_index_cannot_be_created(client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("index creation failed")
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM collection_versions WHERE name = :name"), {"name": init_data.SCHEMA_MARKER})
+    monkeypatch.setattr(init_data, "merge_duplicate_attendance", fail)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX uq_attendance_employee_date"))
+        conn.execute(text(
+            "INSERT INTO attendance (id, employee_id, date, status) VALUES "
+            "(:a, 'dup2@example.com', '2020-01-07', 'ABSENT'), (:b, 'dup2@example.com', '2020-01-07', 'ABSENT')"
+        ), {"a": "a" * 32, "b": "b" * 32})
+
+    with pytest.raises(RuntimeError):
+        init_data.ensure_initialized()
+    assert not init_data.is_initialized()
+
+    monkeypatch.undo()
+    assert init_data.ensure_initialized()
+    assert init_data.is_initialized()
+    assert "uq_attendance_employee_date" in attendance_indexes()
@@ -0,0 +1,68 @@
+import json
+import threading
+
+import pytest
+
+import json_io
+from json_io import CoalescingJSONWriter, JSONDocumentCache, atomic_write_json
+
+
+def test_concurrent_writes_share_flushes(tmp_path):
+    path = str(tmp_path / "doc.json")
+    writer = CoalescingJSONWriter(window_seconds=0.05)
+    start = threading.Barrier(20)
+
+    def write(n):
+        start.wait()
+        writer.write(path, {"n": n})
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert writer.requests == 20
+    assert writer.flushes < 20
+    assert json.loads(open(path).read())["n"] in range(20)
+
+
+def test_sequential_writes_each_reach_disk(tmp_path):
+    path = str(tmp_path / "doc.json")
+    writer = CoalescingJSONWriter()
+
+    writer.write(path, [1])
+    assert json.loads(open(path).read()) == [1]
+    writer.write(path, [2])
+    assert json.loads(open(path).read()) == [2]
+    assert writer.flushes == 2
+
+
+def test_write_error_reaches_the_caller_and_the_writer_recovers(tmp_path, monkeypatch):
+    path = str(tmp_path / "doc.json")
+    writer = CoalescingJSONWriter()
+
+    def fail(file_path, data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(json_io, "atomic_write_json", fail)
+    with pytest.raises(OSError):
+        writer.write(path, [1])
+
+    monkeypatch.undo()
+    writer.write(path, [2])
+    assert json.loads(open(path).read()) == [2]
+
+
+def test_document_cache_follows_writes(tmp_path):
+    path = str(tmp_path / "doc.json")
+    cache = JSONDocumentCache(max_bytes=1 << 20)
+
+    atomic_write_json(path, [1])
+    assert cache.load(path) == [1]
+    assert cache.load(path) == [1]
+    assert cache.stats()["hits"] == 1
+
+    atomic_write_json(path, [1, 2])
+    assert cache.load(path) == [1, 2]
+    assert cache.load(str(tmp_path / "missing.json")) is None
@@ -0,0 +1,62 @@
+import json
+import threading
+
+from leave_store import LeaveStore
+
+
+def run_with_timeout(fn, seconds=10):
+    """Run fn on a daemon thread; fail instead of hanging the suite if it deadlocks"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = fn()
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "timed out, likely a lock deadlock"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+
+def make_store(tmp_path, compact_every=3):
+    return LeaveStore(str(tmp_path / "leaves.json"), str(tmp_path / "leaves.log"), compact_every=compact_every)
+
+
+def test_creates_past_compact_every_do_not_deadlock(tmp_path):
+    store = make_store(tmp_path)
+
+    records = run_with_timeout(lambda: [
+        store.create({"user_id": i % 2, "status": "PENDING"}) for i in range(7)
+    ])
+
+    assert [r["id"] for r in records] == list(range(1, 8))
+    # Two compactions folded six records into the snapshot; the seventh is in the log
+    assert len(json.loads((tmp_path / "leaves.json").read_text())) == 6
+    assert len((tmp_path / "leaves.log").read_bytes().splitlines()) == 1
+
+
+def test_other_instance_sees_compacted_and_logged_records(tmp_path):
+    store = make_store(tmp_path)
+    run_with_timeout(lambda: [store.create({"user_id": 1, "status": "PENDING"}) for _ in range(4)])
+    run_with_timeout(lambda: store.update(2, {"status": "APPROVED"}))
+
+    other = make_store(tmp_path)
+
+    assert len(other.all()) == 4
+    assert other.get(2)["status"] == "APPROVED"
+    assert [r["id"] for r in other.with_status("PENDING")] == [1, 3, 4]
+
+
+def test_explicit_compact_while_holding_store_lock(tmp_path):
+    store = make_store(tmp_path, compact_every=1000)
+    run_with_timeout(lambda: store.create({"user_id": 1, "status": "PENDING"}))
+
+    run_with_timeout(store.compact)
+
+    assert (tmp_path / "leaves.log").read_bytes() == b""
+    assert make_store(tmp_path).get(1)["status"] == "PENDING"
@@ -0,0 +1,42 @@
+import asyncio
+import fcntl
+import threading
+
+from leave_store import leave_store
+from routes import leaves
+
+
+def test_leave_handlers_run_in_the_threadpool():
+    for handler in (leaves.request_leave, leaves.get_user_leaves, leaves.get_pending_leaves,
+                    leaves.approve_leave, leaves.reject_leave):
+        assert not asyncio.iscoroutinefunction(handler), handler.__name__
+
+
+def test_event_loop_serves_requests_while_the_store_lock_is_held(client, admin_headers):
+    finished = threading.Event()
+    responses = []
+
+    def request_leave():
+        responses.append(client.post("/api/leaves/request", headers=admin_headers, json={
+            "user_id": 1, "start_date": "2030-01-01", "end_date": "2030-01-02", "reason": "Test"
+        }))
+        finished.set()
+
+    # Another worker holding the store lock, e.g. mid-compaction
+    with open(leave_store.lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        blocked = threading.Thread(target=request_leave, daemon=True)
+        blocked.start()
+        try:
+            assert not finished.wait(0.3)
+            # With the loop blocked this would never answer: time out instead of hanging
+            health = []
+            probe = threading.Thread(target=lambda: health.append(client.get("/health")), daemon=True)
+            probe.start()
+            probe.join(5)
+            assert health and health[0].status_code == 200, "event loop blocked behind the store lock"
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    assert finished.wait(10)
+    assert responses[0].status_code == 200
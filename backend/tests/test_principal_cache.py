@@ -0,0 +1,71 @@
+import threading
+import uuid
+
+from principal_cache import Principal, PrincipalCache
+
+
+def principal(employee_id: str, role: str = "EMPLOYEE") -> Principal:
+    return Principal(employee_id=employee_id, user_id=uuid.uuid4(), role=role)
+
+
+def test_hit_miss_and_invalidate():
+    cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+    assert cache.get("a@example.com") is None
+
+    cache.put("a@example.com", principal("a@example.com"))
+    assert cache.get("a@example.com").employee_id == "a@example.com"
+
+    cache.invalidate("a@example.com")
+    assert cache.get("a@example.com") is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("principal_cache.time.monotonic", lambda: now[0])
+    cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+
+    cache.put("a@example.com", principal("a@example.com"))
+    now[0] += 59
+    assert cache.get("a@example.com") is not None
+    now[0] += 2
+    assert cache.get("a@example.com") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", principal("a"))
+    cache.put("b", principal("b"))
+    cache.get("a")
+    cache.put("c", principal("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_zero_ttl_disables_the_cache():
+    cache = PrincipalCache(max_entries=10, ttl_seconds=0)
+    cache.put("a", principal("a"))
+    assert cache.get("a") is None
+
+
+def test_concurrent_use_stays_within_bounds():
+    cache = PrincipalCache(max_entries=50, ttl_seconds=60)
+
+    def churn(worker):
+        for i in range(500):
+            subject = f"{worker}-{i % 80}"
+            if cache.get(subject) is None:
+                cache.put(subject, principal(subject))
+            if i % 7 == 0:
+                cache.invalidate(subject)
+
+    threads = [threading.Thread(target=churn, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert cache.stats()["size"] <= 50
@@ -0,0 +1,53 @@
+import pytest
+
+from query_stats import assert_max_queries
+
+
+@pytest.fixture
+def warm_admin(client, admin_headers):
+    """Resolve the admin principal once so the counts below cover the handlers alone"""
+    assert client.get("/api/users", headers=admin_headers).status_code == 200
+    return admin_headers
+
+
+def test_login_is_one_query(client, employee):
+    email, _ = employee
+    with assert_max_queries(1):
+        response = client.post("/api/auth/login", json={"email": email, "password": "password"})
+    assert response.status_code == 200
+
+
+def test_update_user(client, warm_admin, employee):
+    email, _ = employee
+    payload = {"name": "Updated", "email": email, "role": "EMPLOYEE", "department": "QA"}
+
+    # Load, two version bumps, the UPDATE itself
+    with assert_max_queries(4):
+        response = client.put(f"/api/users/{email}", headers=warm_admin, json=payload)
+    assert response.json()["name"] == "Updated"
+
+
+def test_update_user_with_new_email(client, warm_admin, employee):
+    email, _ = employee
+    payload = {"name": "Renamed", "email": "renamed-" + email, "role": "EMPLOYEE", "department": "QA"}
+
+    # Plus the collision check and the login rename
+    with assert_max_queries(6):
+        response = client.put(f"/api/users/{email}", headers=warm_admin, json=payload)
+    assert response.json()["employee_id"] == "renamed-" + email
+    client.delete(f"/api/users/renamed-{email}", headers=warm_admin)
+
+
+def test_delete_user(client, warm_admin, employee):
+    email, _ = employee
+
+    # Two DELETEs and two version bumps, no lookups
+    with assert_max_queries(4):
+        response = client.delete(f"/api/users/{email}", headers=warm_admin)
+    assert response.status_code == 200
+
+
+def test_assert_max_queries_reports_the_statements(client, warm_admin):
+    with pytest.raises(AssertionError, match="Expected at most 0 queries"):
+        with assert_max_queries(0):
+            client.get("/api/users", headers={**warm_admin, "If-None-Match": ""})
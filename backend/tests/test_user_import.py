@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import delete, event
+
+from config import SessionLocal, engine
+from models import Employee, User
+from user_import import IMPORT_MAX_ROWS
+
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER; the Postgres protocol allows 32,767
+BOUND_PARAMETER_LIMIT = 32766
+
+
+@pytest.fixture
+def default_parameter_limit():
+    """Builds often raise SQLite's limit: hold connections to the default, as a stock install would"""
+    if engine.dialect.name != "sqlite":
+        yield
+        return
+
+    def clamp(dbapi_connection, connection_record, connection_proxy):
+        dbapi_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, BOUND_PARAMETER_LIMIT)
+
+    event.listen(engine, "checkout", clamp)
+    try:
+        yield
+    finally:
+        event.remove(engine, "checkout", clamp)
+
+
+def test_upload_at_the_row_cap(client, admin_headers, default_parameter_limit):
+    # Two addresses already taken; the lookup binds every address twice
+    emails = ["emp@example.com", "jane@example.com"] + [
+        f"cap-{i}@example.com" for i in range(IMPORT_MAX_ROWS - 2)
+    ]
+    csv = "name,email\n" + "".join(f"Cap {i},{email}\n" for i, email in enumerate(emails))
+
+    try:
+        response = client.post(
+            "/api/users/import",
+            headers=admin_headers,
+            files={"file": ("employees.csv", csv.encode(), "text/csv")},
+            data={"default_password": "import-pass"}
+        )
+
+        assert response.status_code == 200, response.text
+        report = response.json()
+        assert (report["total_rows"], report["imported"], report["failed"]) == (IMPORT_MAX_ROWS, IMPORT_MAX_ROWS - 2, 2)
+    finally:
+        db = SessionLocal()
+        try:
+            db.execute(delete(User).where(User.employee_id.like("cap-%")))
+            db.execute(delete(Employee).where(Employee.employee_id.like("cap-%")))
+            db.commit()
+        finally:
+            db.close()
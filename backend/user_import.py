@@ -0,0 +1,159 @@
+import io
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select, union
+
+from models import User, Employee
+
+REQUIRED_COLUMNS = ["name", "email"]
+OPTIONAL_COLUMNS = {"password": "", "role": "EMPLOYEE", "department": "General"}
+ROLES = {"EMPLOYEE", "ADMIN"}
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+IMPORT_MAX_ROWS = 20000
+IMPORT_BATCH_SIZE = 1000
+
+
+# =========================
+# PARSING
+# =========================
+def read_upload(content: bytes, filename: str) -> pd.DataFrame:
+    """Load a CSV or XLSX upload as strings with normalized headers and defaults filled in"""
+    try:
+        if filename.lower().endswith((".xlsx", ".xls")):
+            frame = pd.read_excel(io.BytesIO(content), dtype=str)
+        else:
+            frame = pd.read_csv(io.BytesIO(content), dtype=str, skip_blank_lines=True)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read upload: {e}"
+        )
+
+    frame.columns = [str(c).strip().lower() for c in frame.columns]
+    missing = [c for c in REQUIRED_COLUMNS if c not in frame.columns]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing required columns: {', '.join(missing)}"
+        )
+    if len(frame) > IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many rows: at most {IMPORT_MAX_ROWS} per upload"
+        )
+
+    for column, default in OPTIONAL_COLUMNS.items():
+        if column not in frame.columns:
+            frame[column] = default
+
+    frame = frame[REQUIRED_COLUMNS + list(OPTIONAL_COLUMNS)].fillna("")
+    for column in frame.columns:
+        frame[column] = frame[column].str.strip()
+
+    frame["email"] = frame["email"].str.lower()
+    frame["role"] = frame["role"].str.upper().replace("", OPTIONAL_COLUMNS["role"])
+    frame["department"] = frame["department"].replace("", OPTIONAL_COLUMNS["department"])
+    # Spreadsheet row numbers: header is row 1
+    frame.index = frame.index + 2
+    return frame
+
+
+# =========================
+# VALIDATION
+# =========================
+def existing_accounts_statements(emails: List[str]) -> Iterator:
+    """
+    Upload addresses already used by an employee or a login, one round trip
+    per IMPORT_BATCH_SIZE addresses. Each address is bound twice, and a
+    single statement for IMPORT_MAX_ROWS would pass the 32,766/32,767 bound
+    parameter limits of SQLite and the Postgres protocol.
+    """
+    for start in range(0, len(emails), IMPORT_BATCH_SIZE):
+        chunk = emails[start:start + IMPORT_BATCH_SIZE]
+        yield union(
+            select(Employee.email).where(Employee.email.in_(chunk)),
+            select(User.employee_id).where(User.employee_id.in_(chunk))
+        )
+
+
+def validate(
+    frame: pd.DataFrame,
+    existing: Set[str],
+    default_password: Optional[str] = None
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Split the upload into importable rows and a per-row error report, one column-wise check per rule"""
+    if default_password:
+        frame = frame.assign(password=frame["password"].replace("", default_password))
+
+    checks = pd.DataFrame({
+        "name is required": frame["name"] == "",
+        "email is invalid": ~frame["email"].str.match(EMAIL_PATTERN),
+        "role must be EMPLOYEE or ADMIN": ~frame["role"].isin(ROLES),
+        "password is required": frame["password"] == "",
+        "email appears earlier in the file": frame["email"].duplicated(keep="first") & (frame["email"] != ""),
+        "email already exists": frame["email"].isin(existing),
+    }, index=frame.index)
+
+    failed = checks.any(axis=1)
+    errors = [
+        {
+            "row": int(row),
+            "email": frame.at[row, "email"],
+            "errors": [rule for rule, hit in checks.loc[row].items() if hit]
+        }
+        for row in checks.index[failed]
+    ]
+    return frame[~failed], errors
+
+
+# =========================
+# INSERTS
+# =========================
+def import_batches(valid: pd.DataFrame, password_hashes: List[str]) -> Iterator[Tuple[list, list]]:
+    """(employee rows, user rows) in IMPORT_BATCH_SIZE chunks for executemany inserts"""
+    records = valid.to_dict("records")
+    for start in range(0, len(records), IMPORT_BATCH_SIZE):
+        chunk = records[start:start + IMPORT_BATCH_SIZE]
+        hashes = password_hashes[start:start + IMPORT_BATCH_SIZE]
+
+        employees = [
+            {
+                "id": uuid.uuid4(),
+                "employee_id": r["email"],
+                "full_name": r["name"],
+                "email": r["email"],
+                "department": r["department"],
+                "role": r["role"],
+                "is_active": True
+            }
+            for r in chunk
+        ]
+        users = [
+            {"id": uuid.uuid4(), "employee_id": r["email"], "password_hash": h}
+            for r, h in zip(chunk, hashes)
+        ]
+        yield employees, users
+
+
+EMPLOYEE_INSERT = insert(Employee)
+USER_INSERT = insert(User)
+
+
+def import_report(total: int, imported: int, errors: List[Dict[str, Any]]) -> dict:
+    return {
+        "total_rows": total,
+        "imported": imported,
+        "failed": len(errors),
+        "errors": errors
+    }
+
+
+def import_conflict_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Some emails were created while importing; nothing was imported, retry the upload"
+    )
@@ -1,3 +1,4 @@
+import hmac
 import json
 import os
 from datetime import datetime, timedelta
@@ -5,23 +6,81 @@ from typing import Any, Dict, List, Optional
 
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, SessionLocal
-from models import User   # if models are in same file, import accordingly
+from config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    SessionLocal, AsyncSessionLocal, ReadSessionLocal, AsyncReadSessionLocal,
+    PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES,
+    BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING,
+    JSON_WRITE_COALESCE_MS, JSON_CACHE_MAX_MB, DEVICE_API_KEYS
+)
+from models import User, Employee   # if models are in same file, import accordingly
+from principal_cache import Principal, PrincipalCache
+from password_pool import PasswordHashPool, PoolSaturated
+from json_io import CoalescingJSONWriter, JSONDocumentCache
+from metrics import bcrypt_latency
 
 # =========================
 # PASSWORD HANDLING
 # =========================
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS
+)
+
+# Timed inside the pool thread, so queueing shows up in password_pool stats instead
+bcrypt_hash = bcrypt_latency.timed(pwd_context.hash, "hash")
+bcrypt_verify = bcrypt_latency.timed(pwd_context.verify, "verify")
+
+password_pool = PasswordHashPool(
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING
+)
+
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent password operations, retry shortly",
+        headers={"Retry-After": "1"}
+    )
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    try:
+        return password_pool.run(bcrypt_hash, password)
+    except PoolSaturated:
+        raise _password_pool_busy()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return password_pool.run(bcrypt_verify, plain_password, hashed_password)
+    except PoolSaturated:
+        raise _password_pool_busy()
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a batch on the shared pool, at most one call per worker in flight; equal passwords are hashed once"""
+    unique = list(dict.fromkeys(passwords))
+    try:
+        hashes = dict(zip(unique, password_pool.map(bcrypt_hash, unique, window=password_pool.workers)))
+    except PoolSaturated:
+        raise _password_pool_busy()
+    return [hashes[p] for p in passwords]
+
+async def hash_password_async(password: str) -> str:
+    try:
+        return await password_pool.run_async(bcrypt_hash, password)
+    except PoolSaturated:
+        raise _password_pool_busy()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_pool.run_async(bcrypt_verify, plain_password, hashed_password)
+    except PoolSaturated:
+        raise _password_pool_busy()
 
 # =========================
 # JWT HANDLING
@@ -55,32 +114,108 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db():
+    """Session on DATABASE_READ_URL when set, else the primary; only for routes that never write"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+# =========================
+# DIALECT HELPERS
+# =========================
+def dialect_insert(dialect_name: str):
+    """Return the insert() construct that supports ON CONFLICT for this dialect"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect_name}")
+    return insert
+
 # =========================
 # AUTH DEPENDENCIES
 # =========================
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+principal_cache = PrincipalCache(
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def principal_statement(employee_id: str):
+    return (
+        select(User.id, User.employee_id, Employee.role)
+        .outerjoin(Employee, Employee.employee_id == User.employee_id)
+        .where(User.employee_id == employee_id)
+    )
+
+def to_principal(row) -> Optional[Principal]:
+    if not row:
+        return None
+    return Principal(employee_id=row.employee_id, user_id=row.id, role=row.role or "EMPLOYEE")
+
+def load_principal(db: Session, employee_id: str) -> Optional[Principal]:
+    return to_principal(db.execute(principal_statement(employee_id)).first())
+
+async def load_principal_async(db, employee_id: str) -> Optional[Principal]:
+    result = await db.execute(principal_statement(employee_id))
+    return to_principal(result.first())
+
+def token_subject(token: str) -> str:
     payload = verify_token(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token"
         )
+    return payload.get("sub")
+
+def principal_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found"
+    )
 
-    employee_id = payload.get("sub")
-    user = db.query(User).filter(User.employee_id == employee_id).first()
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    employee_id = token_subject(token)
+    user = principal_cache.get(employee_id)
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+    if user is None:
+        user = load_principal(db, employee_id)
+        if not user:
+            raise principal_not_found()
+        principal_cache.put(employee_id, user)
 
     return user
 
-def require_admin(user=Depends(get_current_user)):
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db=Depends(get_async_db)
+) -> Principal:
+    employee_id = token_subject(token)
+    user = principal_cache.get(employee_id)
+
+    if user is None:
+        user = await load_principal_async(db, employee_id)
+        if not user:
+            raise principal_not_found()
+        principal_cache.put(employee_id, user)
+
+    return user
+
+def check_admin(user: Principal) -> Principal:
     if user.role != "ADMIN":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -88,22 +223,42 @@ def require_admin(user=Depends(get_current_user)):
         )
     return user
 
+def require_admin(user=Depends(get_current_user)):
+    return check_admin(user)
+
+async def require_admin_async(user=Depends(get_current_user_async)):
+    return check_admin(user)
+
+def require_device(x_device_key: Optional[str] = Header(None)) -> str:
+    """Authenticate a badge reader or kiosk by its X-Device-Key header"""
+    # compare_digest only takes ASCII str; headers are latin-1 and keys may be anything, so compare bytes
+    presented = x_device_key.encode() if x_device_key else b""
+    if presented and any(hmac.compare_digest(presented, key.encode()) for key in DEVICE_API_KEYS):
+        return x_device_key
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid device key"
+    )
+
 # =========================
 # JSON HELPERS (LEGACY / FALLBACK)
 # =========================
+json_cache = JSONDocumentCache(max_bytes=JSON_CACHE_MAX_MB * 1024 * 1024)
+
 def read_json_file(file_path: str) -> List[Dict[str, Any]]:
-    if not os.path.exists(file_path):
-        return []
+    """Parsed file content, shared through json_cache: treat the result as read-only"""
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        data = json_cache.load(file_path)
     except (json.JSONDecodeError, IOError):
         return []
+    return data if data is not None else []
+
+json_writer = CoalescingJSONWriter(window_seconds=JSON_WRITE_COALESCE_MS / 1000)
 
 def write_json_file(file_path: str, data: List[Dict[str, Any]]) -> None:
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2, default=str)
+    """Atomically replace file_path; concurrent writes to the same path share one fsync"""
+    json_writer.write(file_path, data)
+    json_cache.invalidate(file_path)
 
 def get_next_id(data: List[Dict[str, Any]]) -> int:
     if not data:
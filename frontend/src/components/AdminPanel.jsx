@@ -1,20 +1,86 @@
 import { useState, useEffect } from 'react'
 import axios from 'axios'
 
+// Live events arriving within this window share one re-fetch
+const LIVE_REFRESH_INTERVAL_MS = 1000
+
+// Attendance rows are unique by id, and by (employee_id, date) should a row come without one
+const attendanceKey = (record) => record.id ?? `${record.employee_id}|${record.date}`
+
+// Rows of `first` win over rows of `second` with the same key; order is kept
+const mergeAttendance = (first, second) => {
+  const keys = new Set(first.map(attendanceKey))
+  return [...first, ...second.filter((record) => !keys.has(attendanceKey(record)))]
+}
+
 function AdminPanel({ user, apiBaseUrl }) {
   const [activeTab, setActiveTab] = useState('leaves')
   const [leaveRequests, setLeaveRequests] = useState([])
   const [attendanceRecords, setAttendanceRecords] = useState([])
+  // /api/attendance/all is paged: the cursor for the page after the oldest record shown
+  const [attendanceCursor, setAttendanceCursor] = useState(null)
   const [users, setUsers] = useState([])
   const [loading, setLoading] = useState(false)
   const [message, setMessage] = useState('')
 
   useEffect(() => {
-    fetchLeaveRequests()
-    fetchAttendanceRecords()
-    fetchUsers()
+    fetchAdminView()
   }, [])
 
+  // One round trip for everything the panel shows on mount
+  const fetchAdminView = async () => {
+    try {
+      const token = localStorage.getItem('token')
+      const response = await axios.get(`${apiBaseUrl}/api/admin/bootstrap`, {
+        headers: { Authorization: `Bearer ${token}` },
+        params: { sections: 'leaves,attendance,users' }
+      })
+      setLeaveRequests(response.data.leaves || [])
+      setAttendanceRecords(response.data.attendance?.items || [])
+      setAttendanceCursor(response.data.attendance?.next_cursor || null)
+      setUsers(response.data.users || [])
+    } catch (err) {
+      console.error('Error fetching admin view:', err)
+      fetchLeaveRequests()
+      fetchAttendanceRecords()
+      fetchUsers()
+    }
+  }
+
+  // Live updates: re-fetch only what changed instead of polling. Events are coalesced so a
+  // burst (the morning check-in storm) costs each open panel one refresh per interval
+  useEffect(() => {
+    const token = localStorage.getItem('token')
+    const source = new EventSource(`${apiBaseUrl}/api/live/stream?token=${encodeURIComponent(token)}`)
+    const timers = {}
+
+    const coalesced = (key, refresh) => () => {
+      if (timers[key]) return
+      timers[key] = setTimeout(() => {
+        timers[key] = null
+        refresh()
+      }, LIVE_REFRESH_INTERVAL_MS)
+    }
+
+    const onAttendance = coalesced('attendance', fetchAttendanceRecords)
+    const onLeave = coalesced('leaves', fetchLeaveRequests)
+    const onResync = () => {
+      onLeave()
+      onAttendance()
+    }
+
+    ;['attendance.check_in', 'attendance.check_out', 'attendance.ingested'].forEach((type) =>
+      source.addEventListener(type, onAttendance)
+    )
+    ;['leave.requested', 'leave.status'].forEach((type) => source.addEventListener(type, onLeave))
+    source.addEventListener('resync', onResync)
+
+    return () => {
+      source.close()
+      Object.values(timers).forEach(clearTimeout)
+    }
+  }, [apiBaseUrl])
+
   const fetchLeaveRequests = async () => {
     try {
       const token = localStorage.getItem('token')
@@ -30,6 +96,7 @@ function AdminPanel({ user, apiBaseUrl }) {
     }
   }
 
+  // Newest page: merged over what is shown, so pages loaded with "Load more" stay
   const fetchAttendanceRecords = async () => {
     try {
       const token = localStorage.getItem('token')
@@ -37,10 +104,34 @@ function AdminPanel({ user, apiBaseUrl }) {
         headers: { Authorization: `Bearer ${token}` }
       })
       console.log('Attendance records fetched:', response.data)
-      setAttendanceRecords(response.data || [])
+      const page = response.data || []
+      setAttendanceRecords((records) => mergeAttendance(page, records))
+      // Keep a cursor that already points past older loaded pages
+      setAttendanceCursor((cursor) => cursor || response.headers['x-next-cursor'] || null)
     } catch (err) {
       console.error('Error fetching attendance records:', err)
       setAttendanceRecords([])
+      setAttendanceCursor(null)
+    }
+  }
+
+  const fetchMoreAttendanceRecords = async () => {
+    if (!attendanceCursor) return
+    setLoading(true)
+    try {
+      const token = localStorage.getItem('token')
+      const response = await axios.get(`${apiBaseUrl}/api/attendance/all`, {
+        headers: { Authorization: `Bearer ${token}` },
+        params: { cursor: attendanceCursor }
+      })
+      const page = response.data || []
+      setAttendanceRecords((records) => mergeAttendance(records, page))
+      setAttendanceCursor(response.headers['x-next-cursor'] || null)
+    } catch (err) {
+      console.error('Error fetching more attendance records:', err)
+      setMessage({ type: 'error', text: `Failed to load more attendance records: ${err.message}` })
+    } finally {
+      setLoading(false)
     }
   }
 
@@ -242,7 +333,9 @@ function AdminPanel({ user, apiBaseUrl }) {
               <div className="flex items-center justify-between mb-6">
                 <h3 className="text-2xl font-bold text-slate-800">Attendance Records</h3>
                 <div className="px-4 py-2 bg-secondary-100 rounded-full">
-                  <span className="text-secondary-700 font-semibold">{attendanceRecords.length} records</span>
+                  <span className="text-secondary-700 font-semibold">
+                    {attendanceRecords.length}{attendanceCursor ? '+' : ''} records
+                  </span>
                 </div>
               </div>
 
@@ -260,7 +353,7 @@ function AdminPanel({ user, apiBaseUrl }) {
                     </thead>
                     <tbody>
                       {attendanceRecords.map((record, index) => (
-                        <tr key={record.id} className="table-row hover:bg-secondary-50 animate-fade-in" style={{ animationDelay: `${index * 0.05}s` }}>
+                        <tr key={attendanceKey(record)} className="table-row hover:bg-secondary-50 animate-fade-in" style={{ animationDelay: `${index * 0.05}s` }}>
                           <td className="px-6 py-4 text-sm font-medium text-slate-900">{record.user_name}</td>
                           <td className="px-6 py-4 text-sm text-slate-600">{new Date(record.date).toLocaleDateString()}</td>
                           <td className="px-6 py-4 text-sm text-slate-600">{record.check_in ? new Date(record.check_in).toLocaleTimeString() : '—'}</td>
@@ -274,6 +367,17 @@ function AdminPanel({ user, apiBaseUrl }) {
                       ))}
                     </tbody>
                   </table>
+                  {attendanceCursor && (
+                    <div className="text-center mt-6">
+                      <button
+                        onClick={fetchMoreAttendanceRecords}
+                        disabled={loading}
+                        className="btn-secondary px-4 py-2 text-sm disabled:opacity-50"
+                      >
+                        {loading ? 'Loading...' : 'Load more'}
+                      </button>
+                    </div>
+                  )}
                 </div>
               ) : (
                 <div className="text-center py-12">